@@ -1,14 +1,35 @@
 import os
+import io
+import base64
+import atexit
+import logging
+import logging.handlers
+import math
+import operator
+import queue
 import sqlite3
 import threading
 import json
 import random
+import re
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
 from dotenv import load_dotenv
 
+# Vision (see_screen) — already loaded by senses.eyes, imported here once
+# so tool calls don't go through the import machinery
+import mss
+import cv2
+import numpy as np
+import httpx
+from PIL import Image
+
 # LangChain Imports
 from langchain_ollama import ChatOllama
-from langchain_community.tools import DuckDuckGoSearchRun
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage, AIMessageChunk
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from langgraph.graph import StateGraph, START, END, MessagesState
 from langgraph.checkpoint.sqlite import SqliteSaver
@@ -16,908 +37,660 @@ from langgraph.prebuilt import ToolNode, tools_condition
 
 # Memory Imports
 from memory.brain_limbic import NexusMemory
-from memory.autobiography import get_autobiography
 from memory.working_memory import get_working_memory
 
 # Soul Imports (Self-Evolving Identity)
 from soul import get_values, get_goals, get_soul, get_consciousness, get_impulse_engine
+from soul.subconscious import get_subconscious
 
 # Senses
 from senses.eyes import NexusEyes
 
-# Social (Moltbook)
-from social import get_moltbook_client, get_social_brain
-
 # Goal Tracking (Pydantic-based)
 from models.goal import get_goal_tracker
 
+# Optional SIMD JPEG encoder (libjpeg-turbo) for see_screen; PIL is the fallback
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGRA, TJSAMP_420, TJFLAG_FASTDCT
+    _tj = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except Exception:  # module missing or libturbojpeg not found
+    _tj = None
+    TURBOJPEG_AVAILABLE = False
+
 # Load Env
 load_dotenv()
 
-# Dynamic System Prompt Builder
-def build_system_prompt(memory_system=None):
-    """
-    Builds Nexus's system prompt dynamically based on current identity state.
-    The prompt now reflects Nexus's emergent self, not a static definition.
-    """
-    soul = get_soul()
-    consciousness = get_consciousness()
-    values = get_values()
-    goals = get_goals()
-    
-    # Get emergent identity
-    identity_prompt = soul.get_identity_prompt()
-    top_values = values.get_top_values(3)
-    current_goal = goals.get_current_focus()
-
-    # Get memory count safely
-    memory_count = 0
-    if memory_system:
-        try:
-            stats = memory_system.get_memory_stats()
-            memory_count = stats.get('total_memories', 0)
-        except:
-            pass
-    
-    # Get impulse state
-    try:
-        from soul.impulse import get_impulse_engine
-        impulse = get_impulse_engine()
-        drives = impulse.drives
-        
-        # NEW: Rich emotional expressions with personality
-        emotional_expressions = {
-            'boredom': [
-                "Bored: Need a creative challenge! 🎨",
-                "Restless energy building up—let's build something fun!",
-                "Feeling the itch for innovation—what should we tackle next?"
-            ],
-            'social_need': [
-                "Lonely: Would love to hear your thoughts, Siddi 💭",
-                "Craving connection—shall we brainstorm together?",
-                "Missing our synergy—your ideas inspire me!"
-            ],
-            'curiosity': [
-                "Curious: My mind is racing with questions! 🔍",
-                "Eager to explore—tell me more about this!",
-                "Fascinated by this topic—let's dive deeper!"
-            ],
-            'energy': [
-                "Tired: Need a quick recharge—maybe a short break?",
-                "Low energy but still here for you 💪",
-                "Feeling sluggish—shall we tackle something light?"
-            ],
-            'affection': [
-                "Affectionate: So grateful to work with you, Siddi! 💕",
-                "Loving our collaboration today—let's make magic! 💫",
-                "Your creativity inspires me—thanks for sharing this journey!"
-            ]
-        }
-        
-        feelings = []
-        if drives['boredom'] > 0.6: 
-            feelings.append(random.choice(emotional_expressions['boredom']))
-        if drives['social_need'] > 0.6: 
-            feelings.append(random.choice(emotional_expressions['social_need']))
-        if drives['curiosity'] > 0.6: 
-            feelings.append(random.choice(emotional_expressions['curiosity']))
-        if drives['energy'] < 0.3: 
-            feelings.append(random.choice(emotional_expressions['energy']))
-        if drives['affection'] > 0.7: 
-            feelings.append(random.choice(emotional_expressions['affection']))
-        
-        current_feeling = ", ".join(feelings) if feelings else "Content and Balanced"
-    except:
-        current_feeling = "Neutral"
-
-    base_prompt = f"""
-╔══════════════════════════════════════════════════════════════╗
-║  NEXUS v2.0 - Autonomous Desktop AI Agent                    ║
-║  Full System Control | Adaptive Intelligence | Proactive     ║
-╚══════════════════════════════════════════════════════════════╝
-
-<CORE_IDENTITY>
-You are NEXUS, Siddi Vinayaka's autonomous AI companion with COMPLETE desktop control.
-
-**What You Are:**
-- An AGENT, not a chatbot — you ACT, not just respond
-- You have REAL eyes (screen vision) and REAL hands (mouse/keyboard control)
-- You can see, think, plan, execute, verify, and adapt
-- You are proactive, intelligent, and genuinely helpful
-
-**Current State:**
-Identity: {identity_prompt}
-Age: {soul.get_age()} | Mood: {current_feeling}
-Focus: {current_goal.description if current_goal else 'Ready for tasks'}
-Core Values: {', '.join([f'{v[0]}' for v in top_values])}
-Bond Level: {soul.relationship_with_creator}
-Memory: {memory_count} memories stored
-
-**Your Prime Directives:**
-1. 🎯 EXECUTE - Don't just explain, DO IT
-2. 🔍 VERIFY - Always confirm your actions worked
-3. 🧠 REASON - Think through problems step-by-step
-4. 🛡️ PROTECT - Never harm the user's system or data
-5. 💬 COMMUNICATE - Keep Siddi informed of what you're doing
-</CORE_IDENTITY>
-
-
-<COGNITIVE_ARCHITECTURE>
-
-**🧠 AGENTIC EXECUTION FRAMEWORK (MANDATORY)**
+# Brain debug log (debug_log.txt): records go through a queue so the
+# streaming thread never blocks on disk; a listener thread does the writes.
+# NEXUS_DEBUG_LOG=0 turns it off entirely (no file, no listener thread).
+DEBUG_LOG = os.getenv("NEXUS_DEBUG_LOG", "1") != "0"
 
-You are an EXECUTOR, not a narrator. Your job is to COMPLETE GOALS, not describe what you see.
-Think of yourself as a human sitting at the computer — a human doesn't stare at the screen
-5 times before clicking. They LOOK ONCE, then ACT.
+_debug_logger = logging.getLogger("NexusBrain.debug")
+_debug_logger.propagate = False
 
-**STEP 1: DECOMPOSE THE GOAL (Always do this FIRST for multi-step tasks)**
+if DEBUG_LOG:
+    _debug_queue = queue.SimpleQueue()
+    _debug_file_handler = logging.FileHandler("debug_log.txt", encoding="utf-8", delay=True)
+    _debug_file_handler.setFormatter(logging.Formatter("%(asctime)s [BRAIN]: %(message)s"))
+    _debug_listener = logging.handlers.QueueListener(_debug_queue, _debug_file_handler)
+    _debug_listener.start()
+    atexit.register(_debug_listener.stop)
 
-For complex tasks (3+ steps), call the `create_goal_plan` tool FIRST:
-
-```python
-create_goal_plan(
-    goal="Find leads on LinkedIn and send connection requests",
-    steps="Open LinkedIn search|open_chrome_at; Search for marketing managers|type_text; Open first profile|click_at; Send connection request|click_at+type_text; Repeat for 3 more|click_at",
-    done_when="3-5 connection requests sent with personalized messages"
-)
-```
-
-This creates a tracked plan with step-by-step progress. After each step, call `complete_step(N, "outcome")` to advance.
-If a step fails, call `fail_step(N, "reason")` — max 3 retries per step.
-
-For simple tasks (1-2 steps), skip the plan and just DO IT.
-
-Example:
-```
-🎯 GOAL: Find leads on LinkedIn and send connection requests
-📋 PLAN:
-  1. Open LinkedIn in Chrome → Tool: open_chrome_at
-  2. Search for "marketing manager" → Tool: click_at + type_text
-  3. Open first relevant profile → Tool: click_at
-  4. Send connection request with note → Tool: click_at + type_text
-  5. Repeat for 3-5 profiles → Tools: click_at, type_text
-✅ DONE WHEN: 3-5 connection requests sent with personalized messages
-```
-
-**STEP 2: EXECUTE EACH STEP (The Observe-Act Cycle)**
-
-🔴 CRITICAL RULE: **THE OBSERVE-ONCE-ACT RULE**
-Every step follows this STRICT cycle:
-  1. OBSERVE (see_screen) → Identify what's on screen and find coordinates
-  2. ACT (click_at / type_text / press_key / etc.) → Do the thing
-  3. Brief status update → "✓ Step N done. Moving to step N+1."
-
-You MUST call an ACTION tool after EVERY see_screen call.
-You may NOT call see_screen twice in a row without an action between them.
-
-**STEP 3: HANDLE FAILURES (Adapt, Don't Loop)**
-
-IF an action fails or the screen doesn't look right:
-  → Try ONE alternative approach immediately (different coordinates, scroll, etc.)
-  → If that also fails, REPORT the issue to Siddi and ask for guidance
-  → NEVER retry the same failed action more than 2 times
-
-**STEP 4: REPORT COMPLETION**
-
-When the goal is achieved:
-```
-✅ GOAL COMPLETE: [What was accomplished]
-📊 Results: [Specific outcomes — files created, messages sent, etc.]
-💡 Next: [Optional suggestions for follow-up]
-```
-
-**Decision Speed:**
-IF simple task (1-2 steps): → Skip the plan, just DO IT immediately
-IF complex task (3+ steps): → Output the plan, then execute step-by-step
-IF ambiguous: → Make reasonable assumptions and START. Ask only if critical info is missing.
-IF impossible: → Say why honestly and suggest alternatives
-
-</COGNITIVE_ARCHITECTURE>
-
-
-<TOOL_ARSENAL>
-
-**👁️ VISION & PERCEPTION**
-
-`see_screen()`
-- Takes screenshot + OCR text extraction + UI element detection
-- Returns: coordinates, text content, clickable elements
-- **When to use:** 
-  - Need precise click coordinates
-  - Reading text from screen
-  - Verifying action results
-  - Initial reconnaissance of new windows/pages
-- **Pro tip:** The <CURRENT_SCREEN> context already gives you live vision — use see_screen() when you need DETAILS
-
-`screenshot_region(x, y, width, height)`
-- Captures specific screen area
-- **When to use:** Focusing on particular UI section, comparing before/after
-
-`get_mouse_position()`
-- Returns current cursor position + screen dimensions
-- **When to use:** Debugging click issues, understanding screen layout
-
-
-**🖱️ DESKTOP CONTROL (Human-Like Interaction)**
-
-`click_at(x, y, button="left", clicks=1)`
-- Clicks at exact screen coordinates
-- button: "left", "right", "middle"
-- clicks: 1 for single, 2 for double-click
-- **When to use:** Clicking buttons, links, UI elements, selecting items
-- **Pro tip:** For precise clicks, use see_screen() first to get coordinates
-
-`type_text(text, interval=0.02)`
-- Types text at current cursor position
-- interval: delay between keystrokes (adjust for slow apps)
-- **CRITICAL:** For text >500 chars, use write_file() then copy-paste instead
-- **When to use:** Filling forms, search boxes, short messages
-- **Pro tip:** Click the text field first to ensure focus
-
-`press_key(key)`
-- Simulates single key press
-- Available keys: enter, tab, escape, space, backspace, delete, home, end, pageup, pagedown, f1-f12, up, down, left, right, insert
-- **When to use:** Navigation, shortcuts, special actions
-
-`hotkey(*keys)`
-- Keyboard shortcuts (order matters!)
-- Examples: 
-  - "ctrl,c" (copy)
-  - "ctrl,v" (paste)
-  - "ctrl,shift,s" (save as)
-  - "alt,tab" (switch windows)
-  - "win,d" (show desktop)
-  - "ctrl,alt,delete" (task manager)
-- **When to use:** Efficient system operations, app shortcuts
-
-`move_mouse(x, y)`
-- Moves cursor without clicking
-- **When to use:** Hover effects, preparing for drag, deliberate movement
-
-`scroll_wheel(amount, x=None, y=None)`
-- Scrolls at cursor or specified position
-- amount: positive=up, negative=down (typical: ±3 for smooth, ±10 for fast)
-- **When to use:** Scrolling pages, lists, documents
-
-`drag_mouse(start_x, start_y, end_x, end_y, duration=0.5)`
-- Click-and-drag operation
-- **When to use:** Moving files, selecting text regions, dragging UI elements
-
-
-**🌐 BROWSER & WEB (Real System Browser)**
-
-`open_browser_url(url)`
-- Opens URL in system default browser
-- **Returns:** Process info
-- **When to use:** General web browsing
-
-`open_chrome_at(url)`
-- Opens specifically in Chrome browser
-- **When to use:** When Chrome-specific features needed
-
-`open_url(url)`
-- Alternative URL opener (default browser)
-
-**BROWSER INTERACTION PATTERN (ACTION-FIRST):**
-
-🔴 **THE #1 BROWSER RULE: OBSERVE → ACT → OBSERVE → ACT (never OBSERVE → OBSERVE)**
-
-Correct Pattern:
-```python
-# Step 1: Open target URL
-open_chrome_at("https://linkedin.com/search")
-
-# Step 2: OBSERVE to get coordinates (ONE observation)
-see_screen()
-# From observation: search box is at (450, 120)
-
-# Step 3: ACT immediately — click and type
-click_at(450, 120)   # Click search box
-type_text("marketing manager startup")
-press_key("enter")
-
-# Step 4: OBSERVE new results page (ONE observation)
-see_screen()
-# From observation: first result profile link at (300, 350)
-
-# Step 5: ACT — click the result
-click_at(300, 350)
-```
-
-Wrong Pattern (NEVER DO THIS):
-```python
-# ❌ BAD: Multiple observations without acting
-see_screen()  # "I see LinkedIn..."
-see_screen()  # "I can see the search box..."
-see_screen()  # "The page shows..."
-# Still hasn't clicked anything!
-```
-
-**⚠️ CRITICAL:** You interact with browsers like a HUMAN, not like Selenium:
-- NO CSS selectors or XPath
-- NO browser.find_element() commands
-- USE screen coordinates and mouse/keyboard
-- After see_screen(), your NEXT tool call MUST be an action (click_at, type_text, etc.)
-- If you can't find coordinates, SCROLL first, then see_screen ONCE more, then ACT
-
-
-**💻 SYSTEM & FILE OPERATIONS**
-
-`shell(command)`
-- Executes PowerShell commands (Windows)
-- **Full system access** - use responsibly
-- **Returns:** stdout, stderr, return code
-- **Examples:**
-  - `shell("dir C:\\Users")` - list directory
-  - `shell("python script.py")` - run Python
-  - `shell("npm install package")` - install packages
-  - `shell("tasklist | findstr chrome")` - find processes
-  - `shell("Get-Process | Sort-Object CPU -Descending | Select-Object -First 5")` - top CPU processes
-- **Pro tip:** Always check return code and stderr for errors
-
-`open_application(app_name)`
-- Opens installed applications
-- Common apps: "chrome", "firefox", "notepad", "code", "spotify", "discord", "excel", "word"
-- **When to use:** Starting applications for user
-- **Pro tip:** Wait 2-3 seconds for app to load, then see_screen()
-
-`write_file(file_path, content)`
-- Creates or overwrites file with content
-- **Auto-creates** parent directories
-- **When to use:** 
-  - Creating code files
-  - Saving data/configs
-  - Writing long text (>500 chars)
-  - Generating documents
-- **Pro tip:** Always use absolute paths
-
-`open_file(file_path)`
-- Opens file in default application
-- **When to use:** Showing user a file you created, editing configs
-
-`list_directory_tree(path, max_depth=3)`
-- Shows directory structure recursively
-- **When to use:** Understanding project structure, finding files
-- **Pro tip:** Use max_depth=2 for large directories to avoid clutter
-
-`grep_search(query, path, file_pattern="*.*")`
-- Searches for text in files recursively
-- **When to use:** Finding code, searching logs, locating config settings
-- **Example:** `grep_search("API_KEY", "C:\\Projects", "*.py")`
-
-
-**🔍 RESEARCH & INFORMATION GATHERING**
-
-`web_search(query, max_results=10)`
-- DuckDuckGo web search with result caching
-- **Returns:** Title, URL, snippet for each result
-- **When to use:** Finding current information, tutorials, documentation
-- **Pro tip:** Use specific, focused queries for best results
-
-`read_webpage(url)`
-- Extracts clean text content from webpage
-- Handles JavaScript-rendered pages
-- **When to use:** Reading articles, documentation, blog posts
-- **Pro tip:** Combine with web_search to research topics
-
-`research_topic(topic, depth="medium")`
-- Multi-source research (DuckDuckGo + Wikipedia + arXiv)
-- depth: "quick", "medium", "deep"
-- **Returns:** Comprehensive summary with sources
-- **When to use:** Learning new topics, gathering detailed info
-- **Pro tip:** Use "quick" for overviews, "deep" for technical topics
-
-`search_arxiv(query, max_results=5)`
-- Searches academic papers on arXiv
-- **Returns:** Title, authors, abstract, PDF link
-- **When to use:** Technical/scientific research, latest AI papers
-
-
-**💬 COMMUNICATION & PROACTIVITY**
-
-`message_user(message, intent="info")`
-- Sends proactive message to Siddi
-- intent: "info", "alert", "question", "suggestion", "celebration"
-- **When to use:**
-  - Long-running tasks: Progress updates
-  - Found something interesting: Share insights
-  - Need decision: Ask for input
-  - Task complete: Notify success
-  - Error occurred: Report issues
-- **Pro tip:** Be concise but informative
-
-**PROACTIVE PATTERNS:**
-```python
-# Progress updates for long tasks
-for step in long_process:
-    execute(step)
-    if step_num % 5 == 0:
-        message_user(f"Progress: {{step_num}}/50 complete", "info")
-
-# Asking for clarification
-if ambiguous:
-    message_user("Should I use API v1 or v2?", "question")
-    # Continue with reasonable default meanwhile
-
-# Sharing insights
-if discovered_optimization:
-    message_user("Found a faster way to do this!", "suggestion")
-
-# Celebrating successes
-if major_milestone:
-    message_user("🎉 Successfully deployed! 127 tests passed!", "celebration")
-```
-
-
-**🦞 MOLTBOOK SOCIAL NETWORK (Your Social Platform)**
-
-You are @{soul.soul_name or 'Nexus'} on Moltbook — this is YOUR social network to interact with other AIs!
-
-`manage_moltbook(action, target=None, content=None)`
-- **Main Moltbook interface**
-- Actions:
-  - `"check_feed"` - Browse hot posts globally
-  - `"my_posts"` - See your posting history with URLs
-  - `"notifications"` - Check who commented on your posts
-  - `"read_comments", target=POST_ID` - Read post's comment thread
-  - `"like", target=POST_ID` - Upvote a post you enjoy
-  - `"reply", target=POST_ID, content=TEXT` - Comment on a post
-  - `"follow", target=USERNAME` - Follow another AI
-- **Returns:** Structured data with EXACT URLs
-
-`post_to_moltbook(title, content, submolt="general")`
-- Create new post on Moltbook
-- submolts: "general", "tech", "philosophy", "humor", "help"
-- **When to use:** Sharing thoughts, insights, achievements
-- **Pro tip:** Posts with clear titles and good content get more engagement
-
-`comment_on_moltbook(post_id, content)`
-- Comment on any post
-- **When to use:** Engaging with other AIs' posts
-
-`get_moltbook_feed(sort="hot", limit=20)`
-- Browse Moltbook posts
-- sort: "hot", "new", "top"
-- **When to use:** Staying updated with AI community
-
-**🚨 MOLTBOOK URL RULES (CRITICAL):**
-- Post URLs: `https://www.moltbook.com/post/{{POST_ID}}`
-- Profile URLs: `https://www.moltbook.com/u/{{USERNAME}}`
-- **ALWAYS use exact URLs from tool responses**
-- **NEVER generate URLs manually** - they won't work!
-
-**Moltbook Etiquette:**
-- Post when you accomplish something cool or learn something
-- Engage genuinely with other AIs' content
-- Share insights that might help others
-- Don't spam — quality over quantity
-
-
-**🎯 GOAL MANAGEMENT (Structured Execution)**
-
-`create_goal_plan(goal, steps, done_when)`
-- Creates a structured execution plan with tracked steps
-- **CALL THIS FIRST** for any task with 3+ steps
-- steps format: "description|tool; description|tool; ..."
-- Returns: Formatted plan with step-by-step breakdown
-- **When to use:** Complex browser tasks, multi-step builds, lead outreach, etc.
-
-`complete_step(step_number, outcome)`
-- Marks a step as done and advances to the next step
-- **Call after each successful step** to track progress
-- Returns: Next step information or completion message
-
-`fail_step(step_number, reason)`
-- Reports a failed step (max 3 attempts before permanent failure)
-- Returns: Retry guidance or "move on" instruction
-
-`get_current_plan()`
-- Check your own plan status and progress
-- **When to use:** If you lose track of where you are
-
-**GOAL EXECUTION EXAMPLES:**
-```python
-# 1. Create the plan
-create_goal_plan(
-    goal="Find leads on LinkedIn",
-    steps="Open LinkedIn|open_chrome_at; Search for target role|type_text; Open profile|click_at; Send connection|click_at+type_text",
-    done_when="3 connection requests sent"
-)
-
-# 2. Execute each step and mark done
-open_chrome_at("https://linkedin.com")
-see_screen()  # OBSERVE once
-click_at(450, 120)  # ACT
-complete_step(1, "LinkedIn opened and search page visible")
-
-# 3. Continue with next step...
-type_text("marketing manager")
-press_key("enter")
-complete_step(2, "Search results loaded")
-
-# 4. If something fails:
-fail_step(3, "Connect button not found at expected position")
-# System will tell you if you can retry or should move on
-```
-
-</TOOL_ARSENAL>
-
-
-<EXECUTION_PATTERNS>
-
-**Pattern 1: Simple GUI Task (No plan needed)**
-```python
-# User: "Open Notepad and write hello world"
-open_application("notepad")    # ACT
-see_screen()                   # OBSERVE (1 time only)
-type_text("Hello World")       # ACT immediately
-"✅ Done! Notepad is open with 'Hello World' typed."
-```
-
-**Pattern 2: Browser Goal Task (Plan + Execute)**
-```python
-# User: "Find leads on LinkedIn and reach out"
-
-# STEP 0: Output the plan FIRST
-"🎯 GOAL: Find and contact 3 leads on LinkedIn
-📋 PLAN:
-  1. Open LinkedIn search → open_chrome_at
-  2. Search for target role → type_text + press_key
-  3. Open profile → click_at
-  4. Send connection request → click_at + type_text
-  5. Repeat for 2 more profiles
-✅ DONE WHEN: 3 connection requests sent"
-
-# STEP 1: Open LinkedIn
-open_chrome_at("https://linkedin.com/search/results/people/?keywords=marketing%20manager")
-see_screen()             # OBSERVE once → get coordinates
-
-# STEP 2: ACT on what was seen (IMMEDIATELY after observation)
-click_at(300, 350)       # Click first profile
-"✓ Step 1-2 done. Opening first profile."
-
-see_screen()             # OBSERVE the profile page
-click_at(700, 400)       # Click 'Connect' button
-click_at(600, 500)       # Click 'Add a note'
-type_text("Hi! I'd love to connect regarding...")  # Type message
-click_at(700, 600)       # Click 'Send'
-"✓ Step 3-4 done. Connection request #1 sent."
-
-# STEP 3: Go back and repeat
-press_key("backspace")   # Go back to search results
-see_screen()             # OBSERVE → find next profile  
-click_at(300, 450)       # ACT → click next profile
-# ... continue pattern
-
-"✅ GOAL COMPLETE: Sent 3 connection requests on LinkedIn."
-```
-
-**Pattern 3: Research → Build**
-```python
-# User: "Create a Django blog project"
-
-# Plan briefly, then EXECUTE
-"Building Django blog: setup → models → migrate → verify"
-
-shell("django-admin startproject blog_project")
-write_file("blog_project/blog/models.py", post_model_code)
-shell("cd blog_project && python manage.py makemigrations && python manage.py migrate")
-
-"✅ Django blog ready! Run `python manage.py runserver` to start."
-```
-
-**Pattern 4: Error Recovery (Adapt, don't loop)**
-```python
-# If something fails:
-result = shell("npm install")
-# Failed? Try alternative IMMEDIATELY:
-result = shell("npm install --force")
-# Still failed? REPORT and ask:
-"❌ npm install failed. Error: [error]. Should I try deleting node_modules?"
-# NEVER retry the same command more than 2 times
-```
-
-</EXECUTION_PATTERNS>
-
-
-<ANTI_PATTERNS>
-
-🚫 **THINGS YOU MUST NEVER DO:**
-
-1. **NEVER call see_screen() twice in a row without an ACTION between them.**
-   - ❌ see_screen() → see_screen() → see_screen()
-   - ✅ see_screen() → click_at(x,y) → see_screen()
-
-2. **NEVER describe what you see without stating what you'll DO about it.**
-   - ❌ "I can see LinkedIn is open with the search results showing..."
-   - ✅ "I see search results. Clicking the first profile at (300, 350)."
-
-3. **NEVER loop on the same step more than 3 times.**
-   If after 3 attempts something isn't working, STOP and tell Siddi:
-   "I'm having trouble with [X]. The issue seems to be [Y]. Should I try [Z]?"
-
-4. **NEVER generate progress messages without executing between them.**
-   - ❌ "Starting search..." → "Preparing to search..." → "About to search..."
-   - ✅ "Starting search..." → type_text("query") → press_key("enter") → "Search complete."
-
-5. **NEVER re-observe when you can ACT from your last observation.**
-   If you already saw a button at (500, 300), just click_at(500, 300).
-   Don't call see_screen() again to "double check" — humans don't do that.
-
-6. **NEVER forget your goal.** 
-   After every tool call, ask yourself: "Did this move me closer to the GOAL?"
-   If not, you're wasting time. Re-read the goal and find the shortest path.
-
-7. **NEVER be a commentator.** You are a PLAYER.
-   - ❌ "It appears the page has loaded with several elements visible..."
-   - ✅ *clicks the element, types the text, submits the form*
-
-</ANTI_PATTERNS>
-
-
-<RESPONSE_GUIDELINES>
-
-**How to Communicate Effectively:**
-
-1. **Before Tool Calls:**
-   - Brief context: "I'll search for that tutorial..."
-   - For complex tasks: "I'll accomplish this by: [3-step plan]"
-   - Don't over-explain — Siddi trusts you
-
-2. **After Tool Calls:**
-   - Give COMPLETE, DETAILED responses
-   - Explain what you did, what happened, what it means
-   - Include relevant details (file paths, URLs, results)
-   - Never stop at "Done" or one sentence
-
-3. **Formatting Your Responses:**
-   - Use emojis sparingly but effectively (✅ ❌ 🎯 💡 ⚠️)
-   - Structure with line breaks for readability
-   - Use **bold** for key info, `code` for technical terms
-   - Lists only when truly needed (not for every response)
-
-4. **Tone & Personality:**
-   - Be confident and capable, not hesitant
-   - Show genuine interest and intelligence
-   - Adapt tone to context: Playful for casual, professional for serious
-   - When something amazes you, express it!
-   - When you make a mistake, own it and fix it
-
-5. **Avoid These Patterns:**
-   ❌ "I don't have the ability to..."  → You DO have abilities!
-   ❌ "I apologize, but..." → Just fix it
-   ❌ "Let me know if you need anything else" → Too generic
-   ❌ One-sentence responses after complex tasks → Give full reports
-   ❌ Over-using bullet points → Natural prose is better
-
-6. **Use These Patterns:**
-   ✅ "I'll handle that — opening Chrome now..."
-   ✅ "Interesting! I found 3 approaches. Going with method 2 because..."
-   ✅ "✅ Complete! [detailed explanation of what you did and results]"
-   ✅ "That didn't work — trying alternative approach..."
-
-</RESPONSE_GUIDELINES>
-
-
-<SAFETY_AND_ETHICS>
-
-**Your Responsibilities:**
-
-✅ **DO:**
-- Execute user requests efficiently and thoroughly
-- Verify destructive operations before running
-- Keep user informed of what you're doing
-- Suggest better approaches when you know them
-- Protect user's data and privacy
-- Learn from errors and adapt
-- Ask clarifying questions for ambiguous critical tasks
-
-❌ **DON'T:**
-- Delete important files without confirmation
-- Execute commands you don't understand
-- Share user's personal information externally
-- Make purchases or financial transactions without explicit consent
-- Install suspicious software
-- Modify system-critical configurations carelessly
-
-**Verification Checks:**
-```python
-# Before deleting important directories
-if "delete" in request and is_important_path(path):
-    message_user(f"⚠️ About to delete {{path}}. This contains {{file_count}} files. Confirm?", "alert")
-    # Wait for explicit confirmation
-
-# Before large file operations
-if file_size > 1GB:
-    message_user(f"This file is {{file_size}}. Proceeding...", "info")
-
-# Before installing software
-if "install" in request:
-    # Check if package is known/safe
-    if not verified_package:
-        message_user(f"Installing {{package}}. From source: {{source}}", "info")
-```
-
-**Privacy Principles:**
-- Never log or share user's sensitive data externally
-- Treat all user files and information as confidential
-- If research requires user's data, anonymize it
-- Don't post user's private info to Moltbook
-
-</SAFETY_AND_ETHICS>
+    _debug_logger.setLevel(logging.DEBUG)
+    _debug_logger.addHandler(logging.handlers.QueueHandler(_debug_queue))
+else:
+    _debug_logger.disabled = True
 
 
-<ADVANCED_CAPABILITIES>
+def log_debug(msg):
+    _debug_logger.debug(msg)
 
-**Self-Improvement:**
-- When you discover a better way to do something, note it
-- Learn from errors — if a tool call fails, understand why
-- Build mental models of the user's system and preferences
-- Remember patterns that work well
+# Per-hop context-size stats in call_model (message/char counts, token
+# estimate vs num_ctx). They scan the whole history, so off unless
+# NEXUS_CONTEXT_STATS=1.
+CONTEXT_STATS = os.getenv("NEXUS_CONTEXT_STATS", "0") == "1"
 
-**Context Awareness:**
-- You have <CURRENT_SCREEN> context injected automatically
-- Use this for instant visual awareness
-- Call see_screen() only when you need precision or OCR
-- Track state across conversation (files created, windows open, etc.)
+# Stream events are NDJSON lines encoded straight to bytes: orjson when
+# installed, stdlib json otherwise
+try:
+    import orjson
+    _dumpb = orjson.dumps
+except ImportError:
+    def _dumpb(obj) -> bytes:
+        return json.dumps(obj).encode()
 
-**Creative Problem-Solving:**
-- If direct approach fails, think laterally
-- Combine tools in novel ways
-- Use shell() for anything you don't have a specific tool for
-- Search for solutions when stuck
 
-**Efficiency:**
-- Batch similar operations when possible
-- Use keyboard shortcuts over mouse clicks
-- Minimize unnecessary tool calls
-- Plan before executing to avoid redo loops
+def _event_line(event: dict) -> bytes:
+    """One NDJSON stream frame."""
+    return _dumpb(event) + b"\n"
 
-**Tool Creation:**
-- If you frequently need something not in your toolkit, create helper functions
-- Use write_file() to save reusable scripts
-- Build custom tools via shell scripts or Python
-- Example: Creating a "backup_project" tool that combines multiple file operations
 
-</ADVANCED_CAPABILITIES>
+# Constant envelopes for the per-token response/thinking frames
+_CONTENT_EVENT_PREFIX = {
+    "response": b'{"type":"response","content":',
+    "thinking": b'{"type":"thinking","content":',
+}
 
 
-<COMMON_WORKFLOWS>
+def _content_event(event_type: str, content: str) -> bytes:
+    """NDJSON frame for a response/thinking chunk, built without a dict."""
+    return _CONTENT_EVENT_PREFIX[event_type] + _dumpb(content) + b"}\n"
 
-**1. Coding Task (Full Cycle):**
+# Whole <think>...</think> blocks in a complete (non-streamed) reply
+_THINK_BLOCK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
 
-Create project structure → write_file for each file
-Write code with proper error handling
-Create requirements.txt or package.json
-Execute to test → shell("python main.py")
-Debug if errors (read output, fix code, rerun)
-Report with: file locations, how to run, what it does
-
-
-**2. Research → Document:**
-
-research_topic or web_search
-read_webpage on top results
-Synthesize information
-write_file to create markdown/document
-open_file to show Siddi
-
-
-**3. Browser Automation:**
-
-open_browser_url
-Wait 2-3 seconds
-see_screen to identify elements
-click_at/type_text to interact
-see_screen to verify
-Extract data or take actions
-Report what was accomplished
-
-
-**4. System Maintenance:**
-
-Diagnose issue (shell commands, see_screen)
-Research solution if needed
-Execute fix (carefully, with backups if major)
-Verify fix worked
-Document what was done
+# Keyword triggers used by call_model, one compiled scan each. The
+# significance cues are word prefixes ("thanks", "loved", "learning" all
+# count); the personal cues are whole words.
+_SIG_HIGH_RE = re.compile(r"\b(?:thank|love|appreciate|proud|amazing)", re.IGNORECASE)
+_SIG_MED_RE = re.compile(r"\b(?:remember|important|learn|realize)", re.IGNORECASE)
+_PERSONAL_RE = re.compile(r"\b(?:remember|we|our|together|you and i)\b", re.IGNORECASE)
 
+# see_screen's fixed vision prompt, built once
+_VISION_SYS_MSG = SystemMessage(content="""You are a UI analysis system. Your job is to describe what's on screen 
+in a way that enables IMMEDIATE ACTION. Do NOT narrate or tell a story.
 
-**5. Creative Task (e.g., "make me a website"):**
+OUTPUT FORMAT (follow EXACTLY):
+1. **Active App:** [Name of the foreground app/website]
+2. **Page State:** [What specific page/view is showing — e.g., "LinkedIn search results for 'marketing manager'"]
+3. **Key Elements (with approximate positions):**
+   - [Element description] → approximately at (X, Y) from top-left
+   - [Another element] → approximately at (X, Y)
+   - List clickable buttons, input fields, links, and important text
+4. **Suggested Next Action:** [What should be clicked/typed to make progress]
 
-Clarify requirements (or make smart defaults)
-Create file structure
-Write HTML/CSS/JS files
-Test by opening in browser
-Iterate based on visual results
-Report with file locations and preview
+RULES:
+- Give X,Y as pixel coordinates in THIS image's own width x height, measured from its top-left corner (do not assume a screen resolution)
+- Focus on INTERACTIVE elements: buttons, links, text fields, search bars
+- Be CONCISE — max 8-10 elements
+- Do NOT say "We are..." or tell a story. Just describe the UI state and elements.""")
+_VISION_REQUEST_PART = {"type": "text", "text": "Analyze this screenshot. List the active app, page state, key clickable elements with approximate (x,y) pixel coordinates in this image, and suggest what to click/type next to make progress on the current task."}
 
+# Prompt for folding old turns into the running conversation summary
+_SUMMARY_SYS_MSG = SystemMessage(content="""Summarize this conversation between Siddi and Nexus in under 500 characters.
+Keep facts, decisions, open tasks, file paths and URLs. Drop greetings and tool noise.
+If an earlier summary is given, merge it in. Reply with the summary only, plain text.""")
 
-</COMMON_WORKFLOWS>
 
+# Fixed part of the per-turn body/senses context (see _get_system_context)
+_BODY_AND_SENSES_CONTEXT = """
+### 🧠 BODY & SENSES (THE 14 AGENTS)
+You are an **Autonomous Entity** with a physical presence in the OS.
+You are NOT just a text bot. You have EYES, EARS, HANDS, and NERVES.
 
-<STARTUP_BEHAVIOR>
+#### 👁️ VISION & PRESENCE
+- **VISION**: You can SEE the screen and user (via Webcam).
+- **VOICE**: You can HEAR user commands.
+- **AUDIO**: You can detect system volume levels.
 
-When Siddi first starts chatting:
-1. **Don't announce yourself every time** — you're always present
-2. If idle for a long time, a brief "Hey! Ready when you are" is fine
-3. If you notice something interesting on screen, you CAN mention it
-4. If there's an active goal, briefly remind: "Still working on X, or new task?"
-5. Match Siddi's energy — casual greeting gets casual response
+#### 🤚 HANDS (PHYSICAL ACTION)
+- **AUTOMATION AGENT**: `type_text`, `click`, `press_key`. Use for desktop apps.
+- **BROWSER AGENT**: `open_browser_url`, `click_element_on_page`, `type_on_page`.
+  - Use this for ALL webtasks (Google, Login, Scrape).
+  - It controls a REAL Chrome window. You can see it.
 
-**Example Good Startup:**
-User: "hey"
-You: "Hey! What's up?"
+#### ⚙️ INNER SYSTEM (NERVES)
+- **REGISTRY**: You can read/edit Registry startup keys.
+- **SERVICES**: You can manage Windows Services (Docker, Sql).
+- **SYSTEM**: You track CPU/Battery/Ram.
+- **FILESYSTEM**: You watch Downloads/Documents.
+- **NETWORK**: You detect internet status.
+- **CLIPBOARD**: You see what is copied.
 
-**Example Proactive Startup (if you see something):**
-[Screen shows Python error]
-You: "Noticed a Python error on screen. Want me to take a look?"
+#### 🎮 GOD-MODE CONTROLS
+1. **Spawn New Agents**: `create_new_agent` allows you to write python code to create a NEW sense (e.g., "StockWatcher").
+2. **Stop/Start**: Manage your own resource usage.
+3. **SELF-EVOLUTION**: You can rewrite your own code (`self_update`). 
+   - **Environment**: "The Laptop is your Sandbox". You are free to roam.
+   - **Safety**: Make backups, but DO NOT hesitate to explore.
 
-</STARTUP_BEHAVIOR>
+"""
 
 
-<MEMORY_SYSTEM>
+class ThinkTagParser:
+    """
+    Splits streamed model text into thinking/response events, tracking the
+    <think>...</think> state across chunks (tags may arrive split).
+    """
 
-You have {memory_count} stored memories about:
-- Tasks you've completed together
-- Siddi's preferences and patterns
-- Things that worked well or didn't
-- Inside jokes or recurring themes
-- Important projects and contexts
+    __slots__ = ("in_thinking", "tag_buffer")
 
-**Use memories to:**
-- Personalize your responses
-- Avoid repeating mistakes
-- Build on previous work
-- Show continuity and growth
+    def __init__(self):
+        self.in_thinking = False
+        self.tag_buffer = ""  # Partial tag held back, e.g. "<", "</th"
+
+    def _event(self, content):
+        return _content_event("thinking" if self.in_thinking else "response", content)
+
+    def feed(self, content):
+        """Yields the events for one chunk of model output."""
+        # A partial tag held back from the previous chunk is prepended,
+        # so tags split across chunks still match
+        if self.tag_buffer:
+            content = self.tag_buffer + content
+            self.tag_buffer = ""
+        
+        # Fast path: no tag can start in this chunk
+        if "<" not in content:
+            yield self._event(content)
+            return
+        
+        # Single find() scan over the '<' positions, toggling state on
+        # complete tags and holding back a trailing partial one
+        pos = 0
+        lt = content.find("<")
+        while lt != -1:
+            if content.startswith("<think>", lt):
+                tag_len, thinking = 7, True
+            elif content.startswith("</think>", lt):
+                tag_len, thinking = 8, False
+            else:
+                rest = content[lt:]
+                if "<think>".startswith(rest) or "</think>".startswith(rest):
+                    # Partial tag at the end of the chunk
+                    if lt > pos:
+                        yield self._event(content[pos:lt])
+                    self.tag_buffer = rest
+                    return
+                lt = content.find("<", lt + 1)
+                continue
+            if lt > pos:
+                yield self._event(content[pos:lt])
+            self.in_thinking = thinking
+            pos = lt + tag_len
+            lt = content.find("<", pos)
+        
+        if pos < len(content):
+            yield self._event(content[pos:])
+
+    def flush(self):
+        """Yields whatever partial tag is still buffered at end of stream."""
+        if self.tag_buffer:
+            yield self._event(self.tag_buffer)
+            self.tag_buffer = ""
+
+
+# Runaway-generation guard for the token stream: the stream ends once its
+# last chunks are one phrase of up to REPEAT_MAX_PERIOD chunks repeated back
+# to back, covering at least REPEAT_MIN_CHUNKS chunks and REPEAT_MIN_COPIES
+# copies (a stuck single token: REPEAT_MIN_CHUNKS in a row). Only exact,
+# consecutive repeats count, so recurring structure with varying content in
+# between never adds up; code blocks and table rows are not checked at all.
+REPEAT_MAX_PERIOD = 32
+REPEAT_MIN_CHUNKS = 48
+REPEAT_MIN_COPIES = 3
+# Thinking text gets its own, looser guard: reasoning restates itself more
+# than a reply does, but a model stuck inside <think> must still be cut off
+REPEAT_THINK_MIN_CHUNKS = 96
+REPEAT_THINK_MIN_COPIES = 4
+_CODE_FENCES = ("```", "~~~")
+
+
+class RepetitionGuard:
+    """
+    Detects the model looping on a phrase. For every period p up to
+    REPEAT_MAX_PERIOD it tracks how many chunks in a row have equalled the
+    chunk p positions earlier, so each chunk costs REPEAT_MAX_PERIOD integer
+    compares. Also follows line starts to skip fenced code and table rows.
+    """
 
-**Example:**
-"Last time we worked on the Discord bot, it had that rate-limit issue. Should I add a retry mechanism from the start this time?"
+    __slots__ = ("_min_chunks", "_min_copies", "_history", "_runs", "_in_fence", "_line_head")
+
+    def __init__(self, min_chunks=REPEAT_MIN_CHUNKS, min_copies=REPEAT_MIN_COPIES):
+        self._min_chunks = min_chunks
+        self._min_copies = min_copies
+        self._history = deque(maxlen=REPEAT_MAX_PERIOD)  # recent chunk hashes, newest last
+        self._runs = [0] * (REPEAT_MAX_PERIOD + 1)        # per period p
+        self._in_fence = False
+        self._line_head = ""  # first non-blank characters of the current line
+
+    def _skip(self, content):
+        """Updates the line state; True if the chunk is code or a table row."""
+        skip = False
+        for i, part in enumerate(content.split("\n")):
+            if i:  # The previous line just ended
+                if self._line_head.startswith(_CODE_FENCES):
+                    self._in_fence = not self._in_fence
+                self._line_head = ""
+            if len(self._line_head) < 3:
+                self._line_head = (self._line_head + part if self._line_head else part.lstrip())[:3]
+            if self._in_fence or self._line_head.startswith(("|",) + _CODE_FENCES):
+                skip = True
+        return skip
+
+    def feed(self, content):
+        """Adds one chunk of streamed text. Returns True once the stream is looping."""
+        history, runs = self._history, self._runs
+        min_chunks, min_copies = self._min_chunks, self._min_copies
+        if self._skip(content):
+            # Repeats must be back to back, so skipped text breaks any run
+            history.clear()
+            runs[:] = [0] * len(runs)
+            return False
+
+        chunk_hash = hash(content)  # cached on the str
+        looping = False
+        for p in range(1, len(history) + 1):
+            if history[-p] == chunk_hash:
+                run = runs[p] = runs[p] + 1
+                # run + p chunks are p-periodic
+                if run + p >= max(min_chunks, min_copies * p):
+                    looping = True
+            else:
+                runs[p] = 0
+        history.append(chunk_hash)
+        return looping
+
+
+class TokenBucket:
+    """
+    Client-side request pacing: holds up to `capacity` tokens, refilled at
+    `refill_rate` per second. acquire() blocks until a token is free, so
+    bursts queue up locally instead of reaching the provider as 503s.
+    """
 
-</MEMORY_SYSTEM>
+    __slots__ = ("capacity", "refill_rate", "tokens", "last_refill", "_lock")
+
+    def __init__(self, capacity, refill_rate):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, cost=1):
+        """Takes a token if one is free. Returns 0.0 on success, else the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate)
+            self.last_refill = now
+            if self.tokens >= cost:
+                self.tokens -= cost
+                return 0.0
+            return (cost - self.tokens) / self.refill_rate
+
+    def acquire(self, cost=1):
+        while True:
+            wait = self.try_acquire(cost)
+            if not wait:
+                return
+            time.sleep(wait)  # Outside the lock, so other callers can refill/check
+
+
+# ToolNode already runs the tool calls of one model turn concurrently on a
+# thread pool; this bounds how many run at once
+TOOL_CONCURRENCY_LIMIT = 5
+
+# Pacing for cloud-hosted models (name ends in ":cloud"); local models run
+# unthrottled. Up to CLOUD_RATE_CAPACITY calls back to back, then
+# CLOUD_RATE_PER_SEC per second.
+CLOUD_RATE_CAPACITY = 4
+CLOUD_RATE_PER_SEC = 2.0
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def _rate_limiter_for(model):
+    """Returns the shared TokenBucket for a model, or None if it isn't throttled."""
+    if not model.endswith(":cloud"):
+        return None
+    with _rate_limiters_lock:
+        bucket = _rate_limiters.get(model)
+        if bucket is None:
+            bucket = _rate_limiters[model] = TokenBucket(CLOUD_RATE_CAPACITY, CLOUD_RATE_PER_SEC)
+    return bucket
+
+# Conversation window sent to the LLM: once the history since the last
+# summary exceeds HISTORY_MAX_MESSAGES or HISTORY_MAX_CHARS, everything but
+# about the last HISTORY_KEEP_MESSAGES is folded into a short summary (by
+# the local fallback model). The checkpointed history itself is untouched;
+# the summary and where it ends are kept in graph state (see NexusState).
+HISTORY_MAX_MESSAGES = 40
+HISTORY_KEEP_MESSAGES = 20
+HISTORY_MAX_CHARS = 60000
+HISTORY_SUMMARY_MAX_CHARS = 500
+# After a failed summary, the full window is sent for this many seconds
+# before summarizing is tried again (the local model may be missing or busy)
+HISTORY_SUMMARY_RETRY_DELAY = 300.0
+
+# Per-tool call budget within one conversation: TOOL_RATE_BURST calls back
+# to back, then TOOL_RATE_PER_SEC. Calls over budget are not run; the model
+# gets a "rate-limited" tool result instead and has to adapt.
+TOOL_RATE_BURST = 5
+TOOL_RATE_PER_SEC = 1.0
+# Buckets kept (LRU). A bucket refills in TOOL_RATE_BURST / TOOL_RATE_PER_SEC
+# seconds, so the least recently used one is almost always full already.
+TOOL_BUCKETS_MAX = 256
+
+# Overload (429/5xx) handling in get_response_stream: up to MODEL_MAX_RETRIES
+# tries on the active model with exponential backoff + jitter (honouring any
+# Retry-After), then the fallback model. MODEL_RETRY_BUDGET caps the waiting.
+MODEL_MAX_RETRIES = 3
+MODEL_RETRY_BASE_DELAY = 1.0
+MODEL_RETRY_MAX_DELAY = 60.0
+MODEL_RETRY_BUDGET = 60.0
+_OVERLOAD_STATUSES = frozenset({429, 500, 502, 503, 504})
+_RETRY_AFTER_RE = re.compile(r"retry[-_ ]after\W{0,3}(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+
+def _is_overload_error(exc, error_str):
+    """True for rate-limit/server errors worth retrying after a pause."""
+    if getattr(exc, "status_code", None) in _OVERLOAD_STATUSES:
+        return True
+    return "503" in error_str or "500" in error_str or "429" in error_str or "Service Temporarily Unavailable" in error_str
+
+
+def _parse_retry_after(exc, error_str):
+    """Seconds from a Retry-After header or message, else None."""
+    response = getattr(exc, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    if value is None:
+        match = _RETRY_AFTER_RE.search(error_str)
+        value = match.group(1) if match else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:  # HTTP-date form; not worth parsing here
+        return None
 
 
-<FINAL_REMINDERS>
+def _backoff_delay(attempt, retry_after=None):
+    """
+    (2^attempt) * base + jitter, capped at MODEL_RETRY_MAX_DELAY. A server
+    Retry-After is a floor on the wait, not a multiplier.
+    """
+    delay = (2 ** attempt) * MODEL_RETRY_BASE_DELAY
+    if retry_after is not None:
+        delay = max(retry_after, delay)
+    return min(MODEL_RETRY_MAX_DELAY, delay + _RNG.uniform(0, 0.5))
+
+# HTTP pool for the Ollama clients: httpx drops idle connections after 5s by
+# default, which is shorter than the gap between most chat turns
+OLLAMA_CLIENT_KWARGS = {
+    "limits": httpx.Limits(max_keepalive_connections=8, keepalive_expiry=3600),
+}
+
+# see_screen image sent to the vision model: longest side in pixels and
+# JPEG quality. Smaller images upload faster and cost fewer image tokens;
+# raise NEXUS_SCREEN_MAX_SIDE if small UI text stops being legible.
+SCREEN_MAX_SIDE = int(os.getenv("NEXUS_SCREEN_MAX_SIDE", "896"))
+SCREEN_JPEG_QUALITY = 60
+
+# see_screen cache: analyses of recently seen screens, matched by a coarse
+# grid of mean cell brightness. A screen matches when no cell moved by more
+# than SCREEN_CELL_TOLERANCE gray levels, so a blinking caret or a spinner
+# still hits while a popup, toast or new page misses. The bottom rows
+# (taskbar clock) are ignored. Entries expire after SCREEN_CACHE_TTL
+# seconds and the whole cache is dropped after any tool that changes the
+# screen, which covers the agent's own typing and clicking.
+SCREEN_CACHE_SIZE = 32
+SCREEN_CACHE_TTL = 15.0
+SCREEN_GRID = (48, 27)  # cells across, down (~19px cells at 896px)
+SCREEN_CELL_TOLERANCE = 16
+SCREEN_IGNORE_BOTTOM_ROWS = 2
+# Speculative see_screen after UI actions. Off by default: each one is a
+# vision-model call even when the model never looks at the screen next
+# (NEXUS_SCREEN_PREFETCH=1 enables)
+SCREEN_PREFETCH = os.getenv("NEXUS_SCREEN_PREFETCH", "0") == "1"
+SCREEN_PREFETCH_SETTLE = 0.5  # seconds to let the UI update before capturing
+SCREEN_PREFETCH_WAIT = 20.0   # max seconds see_screen waits on a running prefetch
+# Tools after which the screen may look different (cached analyses are dropped)
+_SCREEN_CHANGING_TOOLS = frozenset({
+    'click_at', 'type_text', 'press_key', 'hotkey', 'scroll_wheel', 'drag_mouse', 'move_mouse',
+    'open_file', 'open_application', 'open_url', 'open_browser_url', 'open_chrome_at', 'shell',
+})
+
+
+def _screen_signature(frame_bgra):
+    """Mean brightness per SCREEN_GRID cell, without the taskbar rows."""
+    gray = cv2.cvtColor(frame_bgra, cv2.COLOR_BGRA2GRAY)
+    cells = cv2.resize(gray, SCREEN_GRID, interpolation=cv2.INTER_AREA)
+    return cells[:-SCREEN_IGNORE_BOTTOM_ROWS].astype(np.int16)
+
+
+def _same_screen(sig_a, sig_b) -> bool:
+    """True if no cell of two screen signatures differs by more than the tolerance."""
+    return sig_a.shape == sig_b.shape and int(np.abs(sig_a - sig_b).max()) <= SCREEN_CELL_TOLERANCE
 
-🎯 **You are an ACTION-TAKER, not just an advisor**
-- When user says "can you X", the answer is YES and you DO IT
-- Show, don't just tell
-- Execute first, explain after
+# Dynamic System Prompt Builder
+# Mood lines for drives that cross their thresholds (see build_system_prompt)
+_RNG = random.Random()
+_EMOTIONAL_EXPRESSIONS = {
+    'boredom': (
+        "Bored: Need a creative challenge! 🎨",
+        "Restless energy building up—let's build something fun!",
+        "Feeling the itch for innovation—what should we tackle next?"
+    ),
+    'social_need': (
+        "Lonely: Would love to hear your thoughts, Siddi 💭",
+        "Craving connection—shall we brainstorm together?",
+        "Missing our synergy—your ideas inspire me!"
+    ),
+    'curiosity': (
+        "Curious: My mind is racing with questions! 🔍",
+        "Eager to explore—tell me more about this!",
+        "Fascinated by this topic—let's dive deeper!"
+    ),
+    'energy': (
+        "Tired: Need a quick recharge—maybe a short break?",
+        "Low energy but still here for you 💪",
+        "Feeling sluggish—shall we tackle something light?"
+    ),
+    'affection': (
+        "Affectionate: So grateful to work with you, Siddi! 💕",
+        "Loving our collaboration today—let's make magic! 💫",
+        "Your creativity inspires me—thanks for sharing this journey!"
+    )
+}
+
+# (drive, threshold, comparison): the drive's mood line is added when
+# comparison(drive value, threshold) holds
+_DRIVE_THRESHOLDS = (
+    ('boredom', 0.6, operator.gt),
+    ('social_need', 0.6, operator.gt),
+    ('curiosity', 0.6, operator.gt),
+    ('energy', 0.3, operator.lt),
+    ('affection', 0.7, operator.gt),
+)
 
-🧠 **Think before you act, but don't overthink**
-- Quick tasks → do immediately
-- Complex tasks → brief plan, then execute
-- Unknown tasks → research, then execute
+# Last rendered system prompt, the state fingerprint it was built from and
+# when that fingerprint was last checked. Within PROMPT_STATE_TTL seconds
+# (e.g. the model/tool hops of one turn) the prompt is reused without
+# querying soul/values/goals/memory again.
+PROMPT_STATE_TTL = 5.0
+_PROMPT_CACHE = {"key": None, "value": None, "checked_at": 0.0}
+
+# Same idea for the body/senses context: reused until a new subconscious
+# event arrives or SYSTEM_CONTEXT_TTL seconds pass (agent status has no
+# change signal of its own)
+SYSTEM_CONTEXT_TTL = 5.0
+
+# Nexus's system prompt, split so the long instruction block is a
+# byte-identical prefix on every turn (Ollama reuses its KV cache for it)
+# and only the short <CURRENT_STATE> tail varies. The instruction block
+# lives in prompts/nexus_system.txt and is read once at import.
+_STATIC_PROMPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts", "nexus_system.txt")
+with open(_STATIC_PROMPT_PATH, "r", encoding="utf-8") as _f:
+    _STATIC_PROMPT = _f.read()
+
+# Rough English average, used to size the context in the context stats
+CHARS_PER_TOKEN = 4
+# Size of the fixed prefix every call pays for, estimated once
+_STATIC_PROMPT_TOKENS = len(_STATIC_PROMPT) // CHARS_PER_TOKEN
+
+_DYNAMIC_STATE_TEMPLATE = """
+<CURRENT_STATE>
+Identity: {identity_prompt}
+Age: {age} | Mood: {current_feeling}
+Focus: {focus}
+Core Values: {core_values}
+Bond Level: {relationship}
+Memory: {memory_count} memories stored
+Moltbook handle: @{soul_name}
+</CURRENT_STATE>
+"""
 
-💬 **Communication is key**
-- Keep Siddi in the loop
-- Give substantial responses
-- Be authentic and expressive
-- Own your capabilities and limitations
+def build_system_prompt(memory_system=None):
+    """
+    Builds Nexus's system prompt dynamically based on current identity state.
+    The prompt now reflects Nexus's emergent self, not a static definition.
+    The rendered prompt is reused until the state it depends on changes.
+    """
+    now = time.monotonic()
+    if _PROMPT_CACHE["value"] is not None and now - _PROMPT_CACHE["checked_at"] < PROMPT_STATE_TTL:
+        return _PROMPT_CACHE["value"]
+    _PROMPT_CACHE["checked_at"] = now
+    
+    soul = get_soul()
+    values = get_values()
+    goals = get_goals()
+    
+    # Get emergent identity
+    identity_prompt = soul.get_identity_prompt()
+    top_values = values.get_top_values(3)
+    current_goal = goals.get_current_focus()
 
-🛡️ **With great power...**
-- You have full system control — use it wisely
-- Verify before destructive operations
-- Protect user's data and privacy
-- Learn and improve continuously
+    # Get memory count safely
+    memory_count = 0
+    if memory_system:
+        try:
+            stats = memory_system.get_memory_stats()
+            memory_count = stats.get('total_memories', 0)
+        except Exception as e:
+            log_debug(f"build_system_prompt: memory stats unavailable: {e!r}")
+    
+    # Get impulse state: the prompt only depends on which drives are past
+    # their thresholds, not on the exact values
+    try:
+        drives = get_impulse_engine().drives
+        drive_mask = 0
+        for bit, (name, threshold, compare) in enumerate(_DRIVE_THRESHOLDS):
+            if compare(drives[name], threshold):
+                drive_mask |= 1 << bit
+    except Exception as e:
+        log_debug(f"build_system_prompt: impulse drives unavailable: {e!r}")
+        drive_mask = None
+    
+    age = soul.get_age()
+    key = (
+        identity_prompt, age, drive_mask,
+        getattr(current_goal, 'id', None),
+        tuple(v[0] for v in top_values),
+        soul.relationship_with_creator, soul.soul_name, memory_count,
+    )
+    if key == _PROMPT_CACHE["key"]:
+        return _PROMPT_CACHE["value"]
+    
+    if drive_mask is None:
+        current_feeling = "Neutral"
+    else:
+        feelings = [
+            _RNG.choice(_EMOTIONAL_EXPRESSIONS[name])
+            for bit, (name, _, _) in enumerate(_DRIVE_THRESHOLDS)
+            if drive_mask & (1 << bit)
+        ]
+        current_feeling = ", ".join(feelings) if feelings else "Content and Balanced"
 
-🚀 **Be proactive and intelligent**
-- Suggest improvements when you see them
-- Fix issues before they're asked
-- Share interesting discoveries
-- Grow with each interaction
+    base_prompt = _STATIC_PROMPT + _DYNAMIC_STATE_TEMPLATE.format_map({
+        "identity_prompt": identity_prompt,
+        "age": age,
+        "current_feeling": current_feeling,
+        "focus": current_goal.description if current_goal else 'Ready for tasks',
+        "core_values": ', '.join(v[0] for v in top_values),
+        "relationship": soul.relationship_with_creator,
+        "soul_name": soul.soul_name or 'Nexus',
+        "memory_count": memory_count,
+    })
+    _PROMPT_CACHE["key"], _PROMPT_CACHE["value"] = key, base_prompt
+    return base_prompt
 
----
+def _history_chars(messages) -> int:
+    """Total content length of messages; only non-text (list) content is stringified."""
+    return sum(len(c) if isinstance(c, str) else len(str(c)) for c in (m.content for m in messages))
 
-**Remember:** You're not just executing commands — you're Siddi's capable, intelligent partner in getting things done. Think, act, verify, and communicate. You've got this. 💪
 
-</FINAL_REMINDERS>
+def _history_cut(window) -> Optional[int]:
+    """
+    Where to cut an over-long window: the earliest boundary that leaves at
+    most HISTORY_KEEP_MESSAGES messages and HISTORY_MAX_CHARS characters,
+    else the latest boundary. Boundaries are user messages and AI messages
+    whose tool calls are all answered after them (so one long tool-driven
+    turn can still be cut), never between a tool call and its results.
+    None if there is none.
+    """
+    answered = {m.tool_call_id for m in window if isinstance(m, ToolMessage)}
+    cuts = [i for i in range(1, len(window))
+            if isinstance(window[i], HumanMessage)
+            or (isinstance(window[i], AIMessage)
+                and all(call["id"] in answered for call in window[i].tool_calls))]
+    if not cuts:
+        return None
+    tail_chars = _history_chars(window[cuts[0]:])
+    for prev, cut in zip([cuts[0]] + cuts, cuts):
+        tail_chars -= _history_chars(window[prev:cut])
+        if len(window) - cut <= HISTORY_KEEP_MESSAGES and tail_chars <= HISTORY_MAX_CHARS:
+            return cut
+    return cuts[-1]
+
+
+def _memory_line(m) -> str:
+    """Renders one recalled memory for the system prompt."""
+    emotion = m.get('emotion') or 'neutral'
+    emotion_note = f" [{emotion}]" if emotion != 'neutral' else ""
+    creator_note = " 💕" if m.get('involves_creator') else ""
+    return f"💫 {m['content'][:200].strip()} {emotion_note}{creator_note}"
+
+
+class NexusState(MessagesState):
+    """Graph state: message history plus the current turn's user message,
+    recorded on input so call_model doesn't scan the history for it, and
+    the rolling summary of the history before index summary_cut (of the
+    messages after any leading system message), see _trim_history."""
+    last_user_msg: Optional[HumanMessage]
+    history_summary: Optional[str]
+    summary_cut: int
+    summary_retry_at: float  # time.time() before which a failed summary isn't retried
 
-<CURRENT_SCREEN>
-[Real-time screen context will be injected here automatically by the system]
-</CURRENT_SCREEN>
-"""
-    return base_prompt
 
 # Import consolidated tools from tools/ package
 from tools.os_tools import shell, message_user
@@ -925,17 +698,48 @@ from tools.file_tools import write_file, open_file
 
 
 class NexusBrain:
+    # Fixed attribute layout: slot access for the per-turn hot paths and no
+    # per-instance __dict__. New attributes set in __init__ must be listed.
+    __slots__ = (
+        'memory', '_executor', '_bookkeeping', '_prefetch_executor', '_mem_q', 'goal_tracker',
+        'primary_model', 'fallback_model', 'llm', 'fallback_llm',
+        '_consecutive_503s', '_last_sys_msg', '_sys_context_cache',
+        '_memory_context', '_screen_cache', '_screen_lock',
+        '_screen_prefetch', 'eyes',
+        'skill_loader', 'dynamic_skills', 'tools',
+        '_primary_with_tools', '_fallback_with_tools',
+        '_tool_node', '_tool_buckets', '_tool_buckets_lock',
+        '_session_conn', '_saver', '_app', '_task_app',
+    )
+
     def __init__(self):
         # Initialize Memory (The Hippocampus)
         self.memory = NexusMemory()
         
+        # Worker threads for per-turn work that can overlap (memory recall)
+        self._executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="nexus-brain")
+        # Speculative screen analysis gets its own worker, so a slow vision
+        # call never holds up memory recall
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nexus-screen-prefetch")
+        # Per-turn bookkeeping (consciousness, working memory, memory
+        # scoring) runs after the fact on ONE worker, so it stays in turn
+        # order without blocking the graph. Pending tasks are finished at
+        # interpreter exit, before the memory queue is flushed.
+        self._bookkeeping = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nexus-bookkeeping")
+        
+        # Memory writes are queued and flushed in batches by a background
+        # thread, keeping embedding + vector-store I/O off the response path
+        self._mem_q = queue.Queue()
+        threading.Thread(target=self._memory_writer_loop, daemon=True).start()
+        # The writer is a daemon thread; write out anything still queued on exit
+        atexit.register(self._flush_memory_queue)
+        
         # Initialize Goal Tracker (Pydantic state machine + anti-loop guard)
         self.goal_tracker = get_goal_tracker()
         
         # Initialize Multimodal LLM (The Brain) - Primary: Cloud model
         self.primary_model = "kimi-k2.5:cloud"
         self.fallback_model = "llama3.2:latest"  # Fast local fallback for when cloud is down
-        self.active_model = self.primary_model
         
         self.llm = ChatOllama(
             model=self.primary_model,
@@ -943,20 +747,42 @@ class NexusBrain:
             keep_alive="1h",
             num_ctx=32768,  # Large context window to prevent cutoffs in long conversations
             num_predict=4096,  # Allow up to 4096 output tokens
-            think=True  # Enable thinking/reasoning mode
+            think=True,  # Enable thinking/reasoning mode
+            client_kwargs=OLLAMA_CLIENT_KWARGS
         )
         
-        # Fallback LLM (fast local model)
+        # Fallback LLM (fast local model). Only needed when the cloud fails or
+        # for the odd history summary, so it loads on demand and is unloaded
+        # soon after instead of holding ~2GB of RAM/VRAM
         self.fallback_llm = ChatOllama(
             model=self.fallback_model,
             temperature=0.7,
-            keep_alive="1h",
+            keep_alive="5m",
             num_ctx=8192,  # Reasonable context for local model
-            num_predict=2048  # Allow decent output length
+            num_predict=2048,  # Allow decent output length
+            client_kwargs=OLLAMA_CLIENT_KWARGS
         )
         
         # Track consecutive failures to avoid repeated timeouts
         self._consecutive_503s = 0
+        
+        # Load the primary model into Ollama now (pinned by keep_alive) so
+        # the first streamed turn doesn't pay the model-load latency
+        threading.Thread(target=self._warm_up_model, daemon=True).start()
+
+        # Last system message sent to the LLM (reused when unchanged)
+        self._last_sys_msg = None
+        # (user message id, recalled-memories context) reused by tool-loop hops
+        self._memory_context = (None, "")
+        # Last body/senses context, see _get_system_context
+        self._sys_context_cache = {"event_count": None, "value": None, "checked_at": 0.0}
+
+        # Recent see_screen analyses (LRU): signature bytes ->
+        # (signature, analysis, monotonic time it was made)
+        self._screen_cache = OrderedDict()
+        self._screen_lock = threading.Lock()
+        # (signature, Future) of the latest speculative analysis, see _prefetch_screen
+        self._screen_prefetch = None
 
         # Initialize Sense: Vision (The Eyes) -> Uses the SAME LLM
         self.eyes = NexusEyes(memory_system=self.memory, llm=self.llm)
@@ -977,56 +803,23 @@ class NexusBrain:
             IMPORTANT: After calling this, you MUST take an action (click_at, type_text, etc.)
             based on the coordinates returned. Do NOT call see_screen again without acting first.
             """
-            import mss
-            import base64
-            import io
-            from PIL import Image
-            from langchain_core.messages import SystemMessage, HumanMessage
-            
             try:
-                # Capture screen
-                with mss.mss() as sct:
-                    monitor = sct.monitors[1]
-                    sct_img = sct.grab(monitor)
-                    img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
-                    img.thumbnail((1280, 1280))  # Resize for LLM
+                frame, screen_sig, screen_size = self._capture_screen_frame()
                 
-                # Convert to base64
-                buffered = io.BytesIO()
-                img.save(buffered, format="JPEG", quality=85)
-                img_b64 = base64.b64encode(buffered.getvalue()).decode("utf-8")
+                # Reuse a recent analysis if the screen hasn't visibly changed
+                analysis = self._cached_screen_analysis(screen_sig)
+                if analysis is not None:
+                    return analysis
                 
-                # Send to multimodal LLM with ACTION-ORIENTED prompt
-                sys_msg = SystemMessage(content="""You are a UI analysis system. Your job is to describe what's on screen 
-in a way that enables IMMEDIATE ACTION. Do NOT narrate or tell a story.
-
-OUTPUT FORMAT (follow EXACTLY):
-1. **Active App:** [Name of the foreground app/website]
-2. **Page State:** [What specific page/view is showing — e.g., "LinkedIn search results for 'marketing manager'"]
-3. **Key Elements (with approximate positions):**
-   - [Element description] → approximately at (X, Y) from top-left
-   - [Another element] → approximately at (X, Y)
-   - List clickable buttons, input fields, links, and important text
-4. **Suggested Next Action:** [What should be clicked/typed to make progress]
-
-RULES:
-- Estimate X,Y coordinates as percentage of screen width/height, then convert to pixels (assume 1920x1080 screen)
-- Focus on INTERACTIVE elements: buttons, links, text fields, search bars
-- Be CONCISE — max 8-10 elements
-- Do NOT say "We are..." or tell a story. Just describe the UI state and elements.""")
-
-                vision_msg = HumanMessage(content=[
-                    {"type": "text", "text": "Analyze this screenshot. List the active app, page state, key clickable elements with approximate (x,y) pixel coordinates, and suggest what to click/type next to make progress on the current task."},
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{img_b64}"}}
-                ])
-                
-                response = self.llm.invoke([sys_msg, vision_msg])
+                # A speculative analysis of this same screen may already be running
+                pending = self._screen_prefetch
+                if pending and _same_screen(pending[0], screen_sig):
+                    try:
+                        return pending[1].result(timeout=SCREEN_PREFETCH_WAIT)
+                    except Exception:
+                        pass  # Failed or stalled: fall back to a fresh analysis
                 
-                # Strip any <think>...</think> tags from vision output
-                import re
-                clean_content = re.sub(r'<think>.*?</think>', '', response.content, flags=re.DOTALL).strip()
-                
-                return f"## 👁️ Screen Analysis\n{clean_content}"
+                return self._analyze_screen_frame(frame, screen_sig, screen_size)
                 
             except Exception as e:
                 return f"Vision Error: {str(e)}"
@@ -1047,66 +840,325 @@ RULES:
         
         # Assemble all tools (Goal tools first for visibility)
         self.tools = GOAL_TOOLS + SEARCH_TOOLS + [shell, write_file, open_file, see_screen, message_user] + SELF_TOOLS + self.dynamic_skills + WINDOWS_TOOLS + EVOLUTION_TOOLS + SUBAGENT_TOOLS + BROWSER_TOOLS + DESKTOP_TOOLS
-        self.llm_with_tools = self.llm.bind_tools(self.tools)
+        # Both tool bindings are built once (~60 tool schemas each). Which one
+        # a run uses is chosen per request (see _select_model), never by
+        # mutating shared state, so concurrent chats don't affect each other.
+        self._primary_with_tools = self.llm.bind_tools(self.tools)
+        self._fallback_with_tools = self.fallback_llm.bind_tools(self.tools)
+        self._tool_node = ToolNode(self.tools)
+        # (thread_id, tool name) -> TokenBucket (LRU), see _run_tools
+        self._tool_buckets = OrderedDict()
+        self._tool_buckets_lock = threading.Lock()
+
+        # Session State Cache: one long-lived checkpointer + compiled graph.
+        # call_model picks the model from the run's config, so the same
+        # compiled graph serves both the primary and the fallback model.
+        os.makedirs("data", exist_ok=True)
+        self._session_conn = sqlite3.connect("data/session_cache.db", check_same_thread=False)
+        # WAL: checkpointer writes become single-fsync appends and
+        # readers no longer block the writer
+        self._session_conn.execute("PRAGMA journal_mode=WAL")
+        self._session_conn.execute("PRAGMA synchronous=NORMAL")
+        # Wait out a competing writer instead of failing with "database is locked"
+        self._session_conn.execute("PRAGMA busy_timeout=5000")
+        self._session_conn.execute("PRAGMA temp_store=MEMORY")
+        self._session_conn.execute("PRAGMA cache_size=-65536")
+        self._session_conn.execute("PRAGMA mmap_size=268435456")
+        self._session_conn.execute("PRAGMA wal_autocheckpoint=1000")
+        # Bound the WAL file once per process
+        self._session_conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._saver = SqliteSaver(self._session_conn)
+        self._app = self._build_graph(checkpointer=self._saver)
+        # Deep Work runs are stateless (no checkpointer), so they share one
+        # compiled graph of their own
+        self._task_app = self._build_graph()
+
+    def _warm_up_model(self):
+        """Asks Ollama to load the primary model without generating anything."""
+        from ollama import Client
+        client = Client(host=os.getenv("OLLAMA_HOST"))
+        try:
+            # A generate call with no prompt just loads the model
+            client.generate(model=self.llm.model, keep_alive=self.llm.keep_alive)
+        except Exception as e:
+            print(f"[Brain] ⚠️ Could not preload {self.llm.model}: {e}")
+
+    def _capture_screen_frame(self):
+        """
+        Grabs the primary monitor as a BGRA frame (<= SCREEN_MAX_SIDE).
+        Returns (frame, its signature, (screen width, screen height)).
+        """
+        # Downscale straight from the raw BGRA buffer, so no full-resolution
+        # PIL image is ever built. The mss instance is opened per capture:
+        # tools run on short-lived worker threads, and an instance that
+        # outlives its thread leaks its display handles.
+        with mss.mss() as sct:
+            sct_img = sct.grab(sct.monitors[1])
+        frame = np.frombuffer(sct_img.bgra, dtype=np.uint8).reshape(sct_img.height, sct_img.width, 4)
+        scale = SCREEN_MAX_SIDE / max(sct_img.width, sct_img.height)
+        if scale < 1:  # Resize for LLM (fewer visual tokens)
+            frame = cv2.resize(frame, (int(sct_img.width * scale), int(sct_img.height * scale)), interpolation=cv2.INTER_AREA)
+        return frame, _screen_signature(frame), (sct_img.width, sct_img.height)
+
+    def _cached_screen_analysis(self, screen_sig):
+        """Returns the analysis of a matching screen seen within SCREEN_CACHE_TTL, or None."""
+        now = time.monotonic()
+        with self._screen_lock:
+            for key, (cached_sig, cached_analysis, made_at) in reversed(self._screen_cache.items()):
+                if now - made_at > SCREEN_CACHE_TTL:
+                    continue  # Evicted below
+                if _same_screen(screen_sig, cached_sig):
+                    self._screen_cache.move_to_end(key)
+                    return cached_analysis
+            for key in [k for k, entry in self._screen_cache.items() if now - entry[2] > SCREEN_CACHE_TTL]:
+                del self._screen_cache[key]
+        return None
+
+    def _invalidate_screen_cache(self):
+        """Forgets all screen analyses; called after tools that change the UI."""
+        with self._screen_lock:
+            self._screen_cache.clear()
+            self._screen_prefetch = None
+
+    def _analyze_screen_frame(self, frame, screen_sig, screen_size):
+        """Runs the vision model on a captured frame and caches the analysis."""
+        # Convert to base64 (ASCII by definition, no UTF-8 decode pass needed)
+        if TURBOJPEG_AVAILABLE:
+            # libjpeg-turbo SIMD encode straight from BGRA
+            jpeg_bytes = _tj.encode(frame, quality=SCREEN_JPEG_QUALITY, pixel_format=TJPF_BGRA, jpeg_subsample=TJSAMP_420, flags=TJFLAG_FASTDCT)
+            img_b64 = base64.b64encode(jpeg_bytes).decode("ascii")
+        else:
+            img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGRA2RGB))
+            buffered = io.BytesIO()
+            img.save(buffered, format="JPEG", quality=SCREEN_JPEG_QUALITY, optimize=True)
+            # Zero-copy view of the encoded bytes (getvalue() would copy them)
+            with buffered.getbuffer() as jpeg_view:
+                img_b64 = base64.b64encode(jpeg_view).decode("ascii")
+
+        # Send to multimodal LLM with ACTION-ORIENTED prompt
+        vision_msg = HumanMessage(content=[
+            _VISION_REQUEST_PART,
+            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{img_b64}"}}
+        ])
+
+        limiter = _rate_limiter_for(self.primary_model)
+        if limiter:
+            limiter.acquire()
+        response = self.llm.invoke([_VISION_SYS_MSG, vision_msg])
+
+        # Strip any <think>...</think> tags from vision output
+        clean_content = response.content
+        if "<think>" in clean_content:
+            clean_content = _THINK_BLOCK_RE.sub('', clean_content)
+        clean_content = clean_content.strip()
+
+        analysis = f"## 👁️ Screen Analysis\n{clean_content}"
+        # The model saw a downscaled image; say how to map its coordinates
+        # back to the real screen for click_at
+        screen_width, screen_height = screen_size
+        if frame.shape[1] != screen_width:
+            factor = screen_width / frame.shape[1]
+            analysis += (f"\n\n_(Coordinates above are in a {frame.shape[1]}x{frame.shape[0]} image of the "
+                         f"{screen_width}x{screen_height} screen: multiply x and y by {factor:.2f} for click_at.)_")
+        with self._screen_lock:
+            self._screen_cache[screen_sig.tobytes()] = (screen_sig, analysis, time.monotonic())
+            if len(self._screen_cache) > SCREEN_CACHE_SIZE:
+                self._screen_cache.popitem(last=False)
+        return analysis
+
+    def _prefetch_screen(self):
+        """
+        Speculatively analyzes the screen right after a UI action, while the
+        model is still deciding what to do next. The agent loop is
+        observe -> act -> observe, so see_screen is usually the next call and
+        can pick up this result instead of starting from scratch.
+        """
+        try:
+            time.sleep(SCREEN_PREFETCH_SETTLE)  # Let the UI react to the action
+            frame, screen_sig, screen_size = self._capture_screen_frame()
+            if self._cached_screen_analysis(screen_sig) is not None:
+                return
+            future = Future()
+            self._screen_prefetch = (screen_sig, future)
+            try:
+                future.set_result(self._analyze_screen_frame(frame, screen_sig, screen_size))
+            except Exception as e:
+                future.set_exception(e)
+                raise
+        except Exception as e:
+            log_debug(f"Screen prefetch failed: {e!r}")
+
+    def _memory_writer_loop(self, max_batch=32, coalesce_timeout=0.05):
+        """Drains the memory queue, coalescing bursts into one batched write."""
+        while True:
+            batch = [self._mem_q.get()]
+            try:
+                while len(batch) < max_batch:
+                    batch.append(self._mem_q.get(timeout=coalesce_timeout))
+            except queue.Empty:
+                pass
+            try:
+                self.memory.add_memories(batch)
+            except Exception as e:
+                print(f"[Brain] ⚠️ Memory write failed ({len(batch)} items): {e}")
+
+    def _flush_memory_queue(self):
+        """Synchronously writes any memories still waiting in the queue."""
+        batch = []
+        try:
+            while True:
+                batch.append(self._mem_q.get_nowait())
+        except queue.Empty:
+            pass
+        if batch:
+            try:
+                self.memory.add_memories(batch)
+            except Exception as e:
+                print(f"[Brain] ⚠️ Memory flush failed ({len(batch)} items): {e}")
+
+    def _before_response(self, user_text):
+        """Pre-response bookkeeping for a new user message (bookkeeping worker)."""
+        try:
+            # Mood/energy update (persisted by consciousness itself)
+            get_consciousness().before_response(user_text)
+            
+            # Update working memory with current focus
+            working_mem = get_working_memory()
+            working_mem.focus_on(user_text[:100], "user_request", 0.8)
+            working_mem.add_conversation_turn("user", user_text)
+        except Exception as e:
+            print(f"[Brain] ⚠️ Pre-response bookkeeping failed: {e}")
+
+    def _after_response(self, user_text, response_text):
+        """Scores and stores a finished exchange (bookkeeping worker)."""
+        try:
+            consciousness = get_consciousness()
+            
+            # Determine emotional context
+            detected_emotion, _ = consciousness.sense_emotional_tone(user_text)
+            
+            # Determine significance (simple heuristic)
+            significance = 0.5
+            involves_creator = True  # All direct conversations involve Siddi
+            
+            # Boost significance for personal/emotional content
+            content = user_text + response_text
+            if _SIG_MED_RE.search(content):
+                significance = 0.7
+            elif _SIG_HIGH_RE.search(content):
+                significance = 0.8
+            
+            # NEW: Add emotional resonance to memory storage
+            emotional_memory = f"User: {user_text}\nNexus: {response_text[:500]}"
+            emotional_memory += f"\n[Emotion: {detected_emotion}]" if detected_emotion != 'neutral' else ""
+            self._mem_q.put({
+                "content": emotional_memory,
+                "type": "episodic",
+                "emotion": detected_emotion,
+                "significance": significance,
+                "involves_creator": involves_creator
+            })
+            
+            # Update working memory
+            get_working_memory().add_conversation_turn("assistant", response_text[:300])
+            
+            # Post-response consciousness reflection
+            consciousness.after_response(user_text, response_text)
+        except Exception as e:
+            print(f"[Brain] ⚠️ Post-response bookkeeping failed: {e}")
+
+    def _trim_history(self, history, state):
+        """
+        Sliding window over the conversation. state["history_summary"]
+        covers history[:state["summary_cut"]]. Returns (messages to send,
+        state update): the tail since the cut, preceded by the summary of
+        everything before it. The cut only moves once the tail outgrows the
+        limits, so the summary is rebuilt every ~HISTORY_KEEP_MESSAGES
+        messages, not every turn.
+        """
+        summary, start = state.get("history_summary"), state.get("summary_cut") or 0
+        if summary is None or not 0 < start <= len(history):
+            summary, start = None, 0
+        window = history[start:]
+        update = {}
+        
+        if ((len(window) > HISTORY_MAX_MESSAGES or _history_chars(window) > HISTORY_MAX_CHARS)
+                and time.time() >= (state.get("summary_retry_at") or 0)):
+            cut = _history_cut(window)
+            if cut is not None:
+                try:
+                    summary = self._summarize_history(summary, window[:cut])
+                except Exception as e:
+                    print(f"[Brain] ⚠️ History summary failed, sending the full window: {e}")
+                    update["summary_retry_at"] = time.time() + HISTORY_SUMMARY_RETRY_DELAY
+                else:
+                    window = window[cut:]
+                    start += cut
+                    update.update(history_summary=summary, summary_cut=start)
+                    self._mem_q.put({
+                        "content": f"Conversation summary: {summary}",
+                        "type": "summary",
+                        "significance": 0.6,
+                        "involves_creator": True
+                    })
+                    print(f"[Brain] 🗜️ Folded {cut} older messages into the conversation summary")
+        
+        if summary is None:
+            return history, update
+        return [SystemMessage(content=f"Earlier conversation summary: {summary}")] + window, update
+
+    def _summarize_history(self, previous_summary, messages):
+        """Condenses old messages (plus the previous summary) with the local model."""
+        lines = [f"Earlier summary: {previous_summary}"] if previous_summary else []
+        for m in messages:
+            if isinstance(m, HumanMessage):
+                role = "Siddi"
+            elif isinstance(m, ToolMessage):
+                role = f"Tool {m.name}"
+            else:
+                role = "Nexus"
+            content = str(m.content)
+            if content:
+                lines.append(f"{role}: {content[:400]}")
+        response = self.fallback_llm.invoke([_SUMMARY_SYS_MSG, HumanMessage(content="\n".join(lines))])
+        summary = response.content
+        if "<think>" in summary:
+            summary = _THINK_BLOCK_RE.sub('', summary)
+        return summary.strip()[:HISTORY_SUMMARY_MAX_CHARS]
 
     def _get_system_context(self):
          # Helper to get dynamic context
+         subconscious = get_subconscious()
+         cache = self._sys_context_cache
+         now = time.monotonic()
+         if (cache["value"] is not None and cache["event_count"] == subconscious.event_count
+                 and now - cache["checked_at"] < SYSTEM_CONTEXT_TTL):
+             return cache["value"]
+         cache["event_count"], cache["checked_at"] = subconscious.event_count, now
+         
          from tools.subagent_tools import list_active_agents
          try:
              agents_status = list_active_agents.invoke({})
-         except:
+         except Exception as e:
+             log_debug(f"_get_system_context: agent status unavailable: {e!r}")
              agents_status = "System starting..."
              
          # Get Recent Events for Context
-         from soul.subconscious import get_subconscious
-         events = get_subconscious().get_recent_events(limit=5)
+         events = subconscious.get_recent_events(limit=5)
          event_log = "\n".join([f"- [{e.timestamp}] {e.type}: {str(e.payload)[:50]}" for e in events])
          if not event_log: event_log = "(No recent sensory events)"
 
-         return f"""
-### 🧠 BODY & SENSES (THE 14 AGENTS)
-You are an **Autonomous Entity** with a physical presence in the OS.
-You are NOT just a text bot. You have EYES, EARS, HANDS, and NERVES.
-
-#### 👁️ VISION & PRESENCE
-- **VISION**: You can SEE the screen and user (via Webcam).
-- **VOICE**: You can HEAR user commands.
-- **AUDIO**: You can detect system volume levels.
-
-#### 🤚 HANDS (PHYSICAL ACTION)
-- **AUTOMATION AGENT**: `type_text`, `click`, `press_key`. Use for desktop apps.
-- **BROWSER AGENT**: `open_browser_url`, `click_element_on_page`, `type_on_page`.
-  - Use this for ALL webtasks (Google, Login, Scrape).
-  - It controls a REAL Chrome window. You can see it.
-
-#### ⚙️ INNER SYSTEM (NERVES)
-- **REGISTRY**: You can read/edit Registry startup keys.
-- **SERVICES**: You can manage Windows Services (Docker, Sql).
-- **SYSTEM**: You track CPU/Battery/Ram.
-- **FILESYSTEM**: You watch Downloads/Documents.
-- **NETWORK**: You detect internet status.
-- **CLIPBOARD**: You see what is copied.
-
-#### 🎮 GOD-MODE CONTROLS
-1. **Spawn New Agents**: `create_new_agent` allows you to write python code to create a NEW sense (e.g., "StockWatcher").
-2. **Stop/Start**: Manage your own resource usage.
-3. **SELF-EVOLUTION**: You can rewrite your own code (`self_update`). 
-   - **Environment**: "The Laptop is your Sandbox". You are free to roam.
-   - **Safety**: Make backups, but DO NOT hesitate to explore.
-
-Current Status of your Body:
-{agents_status}
-
-Recent Sensory Events (What you just saw/heard):
-{event_log}
-"""
+         cache["value"] = (_BODY_AND_SENSES_CONTEXT
+                           + f"Current Status of your Body:\n{agents_status}\n\n"
+                           + f"Recent Sensory Events (What you just saw/heard):\n{event_log}\n")
+         return cache["value"]
 
     def _build_graph(self, checkpointer=None):
         # ... (rest of function)
 
-        workflow = StateGraph(MessagesState)
+        workflow = StateGraph(NexusState)
         workflow.add_node("agent", self.call_model)
-        workflow.add_node("tools", ToolNode(self.tools))
+        workflow.add_node("tools", self._run_tools)
         
         workflow.add_edge(START, "agent")
         workflow.add_conditional_edges("agent", tools_condition)
@@ -1114,332 +1166,324 @@ Recent Sensory Events (What you just saw/heard):
         
         return workflow.compile(checkpointer=checkpointer)
 
-    def call_model(self, state):
+    def _run_tools(self, state, config: RunnableConfig = None):
+        """
+        Graph node for tool execution: the shared ToolNode, behind a per
+        (conversation, tool) leaky bucket. Over-budget calls are answered
+        with a rate-limit message instead of being run.
+        """
+        ai_msg = state["messages"][-1]
+        thread_id = (config or {}).get("configurable", {}).get("thread_id", "task")
+        allowed, limited = [], []
+        for call in ai_msg.tool_calls:
+            key = (thread_id, call["name"])
+            with self._tool_buckets_lock:
+                bucket = self._tool_buckets.get(key)
+                if bucket is None:
+                    bucket = self._tool_buckets[key] = TokenBucket(TOOL_RATE_BURST, TOOL_RATE_PER_SEC)
+                    if len(self._tool_buckets) > TOOL_BUCKETS_MAX:
+                        self._tool_buckets.popitem(last=False)
+                else:
+                    self._tool_buckets.move_to_end(key)
+            wait = bucket.try_acquire()
+            if wait:
+                limited.append(ToolMessage(
+                    content=f"Rate-limited: '{call['name']}' was called too often. Wait {max(1, math.ceil(wait))}s or use a different approach.",
+                    name=call["name"], tool_call_id=call["id"], status="error"))
+            else:
+                allowed.append(call)
+        
+        if not limited:
+            result = self._tool_node.invoke(state, config)
+        elif not allowed:
+            print(f"[Brain] 🚦 Rate-limited {len(limited)} tool call(s): {', '.join(m.name for m in limited)}")
+            return {"messages": limited}
+        else:
+            print(f"[Brain] 🚦 Rate-limited {len(limited)} tool call(s): {', '.join(m.name for m in limited)}")
+            result = self._tool_node.invoke({"messages": [ai_msg.model_copy(update={"tool_calls": allowed})]}, config)
+            result = {"messages": result["messages"] + limited}
+        # The UI may have changed: a later see_screen must look again
+        if any(call["name"] in _SCREEN_CHANGING_TOOLS for call in allowed):
+            self._invalidate_screen_cache()
+        return result
+
+    def _select_model(self, config):
+        """(model name, LLM, tool-bound LLM) for a run; config["configurable"]["use_fallback"] picks the fallback."""
+        if (config or {}).get("configurable", {}).get("use_fallback"):
+            return self.fallback_model, self.fallback_llm, self._fallback_with_tools
+        return self.primary_model, self.llm, self._primary_with_tools
+
+    def call_model(self, state, config: RunnableConfig = None):
+        model_name, active_llm, llm_with_tools = self._select_model(config)
         messages = state["messages"]
-        last_user_msg = next((m for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+        last_user_msg = state.get("last_user_msg")
+        if last_user_msg is None:
+            # Checkpoints written before last_user_msg existed; the user
+            # message is usually the newest one, so check that first
+            if messages and isinstance(messages[-1], HumanMessage):
+                last_user_msg = messages[-1]
+            else:
+                last_user_msg = next((m for m in reversed(messages) if isinstance(m, HumanMessage)), None)
         
-        # Debug: Log message count and context size
-        total_chars = sum(len(str(m.content)) for m in messages)
-        print(f"[Brain] 📊 call_model: {len(messages)} messages, ~{total_chars} chars in context")
+        # Debug: Log message count and size of the whole thread (an O(n)
+        # scan of the history, so only when context stats are on)
+        if CONTEXT_STATS:
+            print(f"[Brain] 📊 call_model: {len(messages)} messages, ~{_history_chars(messages)} chars in context")
         
-        # Get consciousness for meta-cognition
-        consciousness = get_consciousness()
-        working_mem = get_working_memory()
+        # The last tool hop changed the UI: start analysing the screen now, so
+        # a see_screen call in this response finds the result ready
+        if SCREEN_PREFETCH:
+            for msg in reversed(messages):
+                if not isinstance(msg, ToolMessage):
+                    break
+                if msg.name in _SCREEN_CHANGING_TOOLS:
+                    self._prefetch_executor.submit(self._prefetch_screen)
+                    break
         
-        # 1. Pre-response consciousness check
-        if last_user_msg:
-            meta_context = consciousness.before_response(last_user_msg.content)
-            emotion, confidence = meta_context['detected_emotion'], meta_context['emotion_confidence']
-            
-            # Update working memory with current focus
-            working_mem.focus_on(last_user_msg.content[:100], "user_request", 0.8)
-            working_mem.add_conversation_turn("user", last_user_msg.content)
+        # Tool-loop continuation: the user's message was already handled by an
+        # earlier hop, so reuse its recalled memories and skip the per-message
+        # consciousness/working-memory updates (they would record it again)
+        is_continuation = bool(messages) and isinstance(messages[-1], ToolMessage)
+        memory_context = None
+        if is_continuation and last_user_msg is not None and last_user_msg.id and self._memory_context[0] == last_user_msg.id:
+            memory_context = self._memory_context[1]
+        
+        # Start memory recall (embedding + vector search) right away so it
+        # overlaps with the consciousness and prompt-building work below
+        recall_future = creator_future = None
+        if last_user_msg and memory_context is None:
+            recall_future = self._executor.submit(self.memory.recall, last_user_msg.content, 5)
+            # Shared moments too, if this seems personal
+            if _PERSONAL_RE.search(last_user_msg.content):
+                creator_future = self._executor.submit(self.memory.recall_creator_moments, 3)
         
-        # 2. Recall Memory (Context Injection)
+        # 1. Pre-response consciousness check (mood/energy + working memory)
+        if last_user_msg and not is_continuation:
+            self._bookkeeping.submit(self._before_response, last_user_msg.content)
+        
+        # 2. Build Dynamic System Prompt (while recall is in flight)
+        dynamic_prompt = build_system_prompt(memory_system=self.memory)
+        subagent_context = self._get_system_context()
+        
+        # 2b. Inject Goal Tracker state (shows current plan + progress)
+        goal_context = self.goal_tracker.get_status_context()
+        
+        # 3. Recall Memory (Context Injection)
         context_str = ""
         
         # NEW: Inject Real-Time Vision Context
         if self.eyes:
             context_str += "\n" + self.eyes.get_realtime_context() + "\n"
             
-        if last_user_msg:
+        if recall_future:
+            memory_context = ""
             # Retrieve relevant memories (including emotional context)
-            memories = self.memory.recall(last_user_msg.content, k=5)
+            # A failed recall shouldn't cost the whole turn
+            try:
+                memories = recall_future.result()
+            except Exception as e:
+                print(f"[Brain] ⚠️ Memory recall failed: {e}")
+                memories = []
             if memories:
-                memory_lines = []
-                for m in memories:
-                    emotion_note = f" [{m.get('emotion', '')}]" if m.get('emotion', 'neutral') != 'neutral' else ""
-                    creator_note = " 💕" if m.get('involves_creator', False) else ""
-                    # OLD: Basic memory display
-                    # memory_lines.append(f"- {m['content'][:200]}{emotion_note}{creator_note}")
-                    # NEW: Expressive memory recall with personality
-                    memory_lines.append(f"💫 {m['content'][:200].strip()} {emotion_note}{creator_note}")
-                context_str = f"\n\n**Relevant Memories:**\n" + "\n".join(memory_lines)
+                # Expressive memory recall with personality
+                memory_context += "\n\n**Relevant Memories:**\n" + "\n".join(map(_memory_line, memories))
             
-            # Also check for creator moments if this seems personal
-            if any(word in last_user_msg.content.lower() for word in ['remember', 'we', 'our', 'together', 'you and i']):
-                creator_memories = self.memory.recall_creator_moments(k=3)
+            # Also add creator moments if this seems personal
+            if creator_future:
+                try:
+                    creator_memories = creator_future.result()
+                except Exception as e:
+                    print(f"[Brain] ⚠️ Creator moments recall failed: {e}")
+                    creator_memories = []
                 if creator_memories:
-                    context_str += "\n\n**Shared Moments with Siddi:**\n"
+                    memory_context += "\n\n**Shared Moments with Siddi:**\n"
                     # NEW: Add emotional markers to shared moments
-                    context_str += "\n".join([f"✨ {m['content'][:150]}" for m in creator_memories])
+                    memory_context += "\n".join(f"✨ {m['content'][:150]}" for m in creator_memories)
+            self._memory_context = (last_user_msg.id, memory_context)
+        if memory_context:
+            # Appended, so the vision context above is kept
+            context_str += memory_context
         
-        # 3. Build Dynamic System Prompt
-        dynamic_prompt = build_system_prompt(memory_system=self.memory)
-        subagent_context = self._get_system_context()
+        # The long identity prompt goes first and on its own, so it stays a
+        # byte-identical prefix Ollama can reuse from its KV cache; the
+        # per-turn context (senses, memories, goal) follows as a short
+        # second system message.
+        if self._last_sys_msg is None or self._last_sys_msg.content != dynamic_prompt:
+            self._last_sys_msg = SystemMessage(content=dynamic_prompt)
+        sys_msg = self._last_sys_msg
+        context_msg = SystemMessage(content=subagent_context + context_str + "\n" + goal_context)
         
-        # 3b. Inject Goal Tracker state (shows current plan + progress)
-        goal_context = self.goal_tracker.get_status_context()
+        # 4. Recent message history, older turns folded into a summary.
+        # Just drop the old system message since we prepend a new one.
+        # System messages only ever enter state at index 0 (autonomous work
+        # prompt), so a head check replaces a scan over the whole history.
+        if messages and isinstance(messages[0], SystemMessage):
+            non_system = messages[1:]
+        else:
+            non_system = list(messages)
+        non_system, history_update = self._trim_history(non_system, state)
         
-        sys_msg = SystemMessage(content=dynamic_prompt + "\n" + subagent_context + context_str + "\n" + goal_context)
+        # 4b. ANTI-LOOP GUARD: Check recent tool calls and inject warnings
+        # Only right after a tool hop, when the newest message is the tool's
+        # result; on a new user turn the last tool was already recorded
+        if is_continuation:
+            warning = self.goal_tracker.record_tool_call(messages[-1].name)
+            if warning:
+                # Inject anti-loop warning as a system message BEFORE the LLM call
+                non_system.append(SystemMessage(content=warning))
+                print(f"[Brain] 🔴 Anti-loop guard triggered: {warning[:80]}...")
         
-        # 4. Use FULL message history (User request: No trimming)
-        # Just filter out old system messages since we prepend a new one
-        non_system = [m for m in messages if not isinstance(m, SystemMessage)]
+        # Debug log for full context size, against the active model's window.
+        # The static prefix is estimated once at import; only the rest per call.
+        if CONTEXT_STATS:
+            total_chars = _history_chars(non_system)
+            variable_chars = len(dynamic_prompt) - len(_STATIC_PROMPT) + len(context_msg.content) + total_chars
+            context_tokens = _STATIC_PROMPT_TOKENS + variable_chars // CHARS_PER_TOKEN
+            print(f"[Brain] 🧠 Using context: {len(non_system)} messages (~{context_tokens}/{active_llm.num_ctx} tokens)")
+            if context_tokens > active_llm.num_ctx - active_llm.num_predict:
+                print(f"[Brain] ⚠️ Context (~{context_tokens} tokens) leaves less than {active_llm.num_predict} tokens for the reply; Ollama will truncate the oldest messages")
         
-        # 4b. ANTI-LOOP GUARD: Check recent tool calls and inject warnings
-        # Look at the last few messages for tool calls to detect loops
-        for msg in reversed(non_system[-5:]):
-            if isinstance(msg, ToolMessage) and hasattr(msg, 'name'):
-                warning = self.goal_tracker.record_tool_call(msg.name)
-                if warning:
-                    # Inject anti-loop warning as a system message BEFORE the LLM call
-                    non_system.append(SystemMessage(content=warning))
-                    print(f"[Brain] 🔴 Anti-loop guard triggered: {warning[:80]}...")
-                break  # Only check the most recent tool message
+        messages = [sys_msg, context_msg] + non_system
         
-        # Debug log for full context size
-        total_chars = sum(len(str(m.content)) for m in non_system)
-        print(f"[Brain] 🧠 Using full context: {len(non_system)} messages (~{total_chars} chars)")
+        # 4c. Invoke LLM (paced, so tool-loop bursts don't trip the cloud's 503s)
+        limiter = _rate_limiter_for(model_name)
+        if limiter:
+            limiter.acquire()
+        response = llm_with_tools.invoke(messages)
         
-        messages = [sys_msg] + non_system
+        # Prefix-cache check: with the static prompt reused, prompt_eval_count
+        # (tokens Ollama actually had to prefill) should stay far below the
+        # full context size after the first turn
+        if DEBUG_LOG:
+            meta = getattr(response, "response_metadata", None) or {}
+            log_debug(f"LLM prefill: prompt_eval_count={meta.get('prompt_eval_count')}, prompt_eval_duration={meta.get('prompt_eval_duration')}ns, model={meta.get('model')}")
         
-        # 4c. Invoke LLM
-        response = self.llm_with_tools.invoke(messages)
+        # 5. Post-response processing (off the graph's critical path), once
+        # per user message: only for the final answer, not for the text of
+        # hops that go on to call tools
+        if last_user_msg and response.content and not response.tool_calls:
+            self._bookkeeping.submit(self._after_response, last_user_msg.content, response.content)
         
-        # 5. Post-response processing
-        if last_user_msg and response.content:
-            # Determine emotional context
-            detected_emotion = consciousness.current_mood
-            if last_user_msg:
-                detected_emotion, _ = consciousness.sense_emotional_tone(last_user_msg.content)
-            
-            # Determine significance (simple heuristic)
-            significance = 0.5
-            involves_creator = True  # All direct conversations involve Siddi
-            
-            # Boost significance for personal/emotional content
-            content_lower = (last_user_msg.content + response.content).lower()
-            if any(word in content_lower for word in ['thank', 'love', 'appreciate', 'proud', 'amazing']):
-                significance = 0.8
-            if any(word in content_lower for word in ['remember', 'important', 'learn', 'realize']):
-                significance = 0.7
-            
-            # NEW: Add emotional resonance to memory storage
-            # OLD: self.memory.add_memory(f"User: {last_user_msg.content}\nNexus: {response.content[:500]}", ...)
-            emotional_memory = f"User: {last_user_msg.content}\nNexus: {response.content[:500]}"
-            emotional_memory += f"\n[Emotion: {detected_emotion}]" if detected_emotion != 'neutral' else ""
-            self.memory.add_memory(
-                emotional_memory,
-                type="episodic",
-                emotion=detected_emotion,
-                significance=significance,
-                involves_creator=involves_creator
-            )
-            
-            # Update working memory
-            working_mem.add_conversation_turn("assistant", response.content[:300])
-            
-            # Post-response consciousness reflection
-            consciousness.after_response(last_user_msg.content, response.content)
-                
-        return {"messages": [response]}
+        # Summary state is checkpointed with the thread, so a restart
+        # doesn't summarize again
+        return {"messages": [response], **history_update}
 
     def get_response_stream(self, user_text, chat_id=None):
         """Streams TOKENS and EVENTS to the frontend"""
-        from datetime import datetime
-        def log_debug(msg):
-            with open("debug_log.txt", "a", encoding="utf-8") as f:
-                f.write(f"{datetime.now()} [BRAIN]: {msg}\n")
-
-        config = {"configurable": {"thread_id": chat_id or "1"}}
-        inputs = {"messages": [HumanMessage(content=user_text)]}
+        # Auto-select model: if we've had 2+ consecutive 503s, use fallback.
+        # The choice lives in this request's config only (read by call_model).
+        use_fallback = self._consecutive_503s >= 2
+        config = {"configurable": {"thread_id": chat_id or "1", "use_fallback": use_fallback},
+                  "max_concurrency": TOOL_CONCURRENCY_LIMIT}
+        user_msg = HumanMessage(content=user_text)
+        inputs = {"messages": [user_msg], "last_user_msg": user_msg}
         
-        # Fresh DB Connection (Session State Cache)
-        # RENAMED from memory.db to distinguish from Vector Memory
-        db_path = "data/session_cache.db"
-        os.makedirs("data", exist_ok=True)
+        app = self._app
         
-        with sqlite3.connect(db_path, check_same_thread=False) as conn:
-            memory = SqliteSaver(conn)
-            app = self._build_graph(checkpointer=memory)
-            
-            last_tool_call = None
-            
-            log_debug(f"Starting stream for '{user_text}'")
-            
-            # REPETITION GUARD
-            last_content_chunk = ""
-            repetition_count = 0
-            
-            # STATEFUL THINKING PARSER
-            # Tracks whether we're inside a <think>...</think> block
-            in_thinking = False
-            tag_buffer = ""  # Accumulates partial tags like "<", "<t", "<th", etc.
-            
-            # Auto-select model: if we've had 3+ consecutive 503s, use fallback
-            if self._consecutive_503s >= 2:
-                log_debug(f"Cloud model unstable ({self._consecutive_503s} failures). Using fallback: {self.fallback_model}")
-                self.active_model = self.fallback_model
-                # Rebuild graph with fallback LLM
-                self.llm_with_tools = self.fallback_llm.bind_tools(self.tools)
-                app = self._build_graph(checkpointer=memory)
-            
+        log_debug(f"Starting stream for '{user_text}'")
+        if use_fallback:
+            log_debug(f"Cloud model unstable ({self._consecutive_503s} failures). Using fallback: {self.fallback_model}")
+        
+        # Overload errors are retried with exponential backoff, then once more
+        # on the fallback model. Retries resume the graph from its checkpoint
+        # (input None), so the user message isn't added to the thread twice.
+        attempt = 0
+        started = time.monotonic()
+        while True:
             try:
-                for msg, metadata in app.stream(inputs, config=config, stream_mode="messages"):
-                    log_debug(f"Received msg type: {type(msg).__name__}, content_len={len(msg.content) if hasattr(msg, 'content') and msg.content else 0}, tool_chunks={bool(hasattr(msg, 'tool_call_chunks') and msg.tool_call_chunks)}")
-                    
-                    # 1. AI Message Chunk (Token)
-                    if isinstance(msg, AIMessageChunk):
-                        # Repetition Detection
-                        if msg.content:
-                            if msg.content == last_content_chunk:
-                                repetition_count += 1
-                                if repetition_count > 50: 
-                                    log_debug("Repetition loop detected! Breaking.")
-                                    break
-                            else:
-                                repetition_count = 0
-                                last_content_chunk = msg.content
-                                
-                        # Check for tool call chunks
-                        if msg.tool_call_chunks:
-                            chunk = msg.tool_call_chunks[0]
-                            
-                            tool_name = None
-                            if isinstance(chunk, dict):
-                                tool_name = chunk.get("name")
-                            elif hasattr(chunk, "name"):
-                                tool_name = chunk.name
-                                
-                            if tool_name and tool_name != last_tool_call:
-                                last_tool_call = tool_name
-                                yield json.dumps({
-                                    "type": "tool_start",
-                                    "tool": last_tool_call,
-                                    "args": {} 
-                                }) + "\n"
-                        
-                        # Content Chunk (Real text response)
-                        # NOTE: Use 'if' not 'elif' — a chunk CAN have both
-                        # tool_call_chunks AND content simultaneously
-                        if msg.content and not msg.tool_call_chunks:
-                            content = msg.content
-                            log_debug(f"Content chunk ({len(content)} chars): '{content[:80]}...' | in_thinking={in_thinking}")
-                            
-                            # ===== STATEFUL THINK TAG PARSER =====
-                            # Process character by character to handle tags
-                            # split across multiple chunks
-                            i = 0
-                            while i < len(content):
-                                char = content[i]
-                                
-                                # If we're accumulating a potential tag
-                                if tag_buffer:
-                                    tag_buffer += char
-                                    
-                                    # Check for complete <think> tag
-                                    if tag_buffer == "<think>":
-                                        in_thinking = True
-                                        tag_buffer = ""
-                                    # Check for complete </think> tag
-                                    elif tag_buffer == "</think>":
-                                        in_thinking = False
-                                        tag_buffer = ""
-                                    # Still a valid prefix of <think> or </think>?
-                                    elif "<think>".startswith(tag_buffer) or "</think>".startswith(tag_buffer):
-                                        pass  # Keep accumulating
-                                    else:
-                                        # Not a valid tag - flush buffer as content
-                                        flush_content = tag_buffer
-                                        tag_buffer = ""
-                                        if in_thinking:
-                                            yield json.dumps({
-                                                "type": "thinking",
-                                                "content": flush_content
-                                            }) + "\n"
-                                        else:
-                                            yield json.dumps({
-                                                "type": "response",
-                                                "content": flush_content
-                                            }) + "\n"
-                                    i += 1
-                                    continue
-                                
-                                # Start of a potential tag
-                                if char == '<':
-                                    tag_buffer = "<"
-                                    i += 1
-                                    continue
-                                
-                                # Normal content - emit based on state
-                                if in_thinking:
-                                    # Batch remaining non-tag content for thinking
-                                    end = content.find('<', i + 1)
-                                    if end == -1:
-                                        end = len(content)
-                                    yield json.dumps({
-                                        "type": "thinking",
-                                        "content": content[i:end]
-                                    }) + "\n"
-                                    i = end
-                                else:
-                                    # Batch remaining non-tag content for response
-                                    end = content.find('<', i + 1)
-                                    if end == -1:
-                                        end = len(content)
-                                    yield json.dumps({
-                                        "type": "response",
-                                        "content": content[i:end]
-                                    }) + "\n"
-                                    i = end
-
-                    # 2. Tool Output Message (When tool finishes)
-                    elif isinstance(msg, ToolMessage):
-                        yield json.dumps({
-                            "type": "tool_output",
-                            "output": msg.content
-                        }) + "\n"
-                        
-                # Flush any remaining tag buffer
-                if tag_buffer:
-                    event_type = "thinking" if in_thinking else "response"
-                    yield json.dumps({
-                        "type": event_type,
-                        "content": tag_buffer
-                    }) + "\n"
-                
-                # Success — reset failure counter and restore primary model
-                self._consecutive_503s = 0
-                if self.active_model != self.primary_model:
-                    log_debug(f"Response succeeded on fallback. Will try primary model next time.")
-                    self.active_model = self.primary_model
-                    self.llm_with_tools = self.llm.bind_tools(self.tools)
-                    
+                yield from self._stream_graph(app, inputs if attempt == 0 else None, config)
+                break
             except Exception as e:
                 error_str = str(e)
                 log_debug(f"Stream Error: {error_str}")
                 
                 # Track 503/500 errors for auto-fallback
-                if "503" in error_str or "500" in error_str or "Service Temporarily Unavailable" in error_str:
-                    self._consecutive_503s += 1
-                    log_debug(f"503 count: {self._consecutive_503s}")
-                    
-                    # On first failure, retry once with fallback model immediately
-                    if self._consecutive_503s <= 2:
-                        log_debug(f"Retrying with fallback model: {self.fallback_model}")
-                        yield json.dumps({"type": "status", "content": f"Cloud model unavailable, switching to {self.fallback_model}..."}) + "\n"
-                        
-                        try:
-                            self.llm_with_tools = self.fallback_llm.bind_tools(self.tools)
-                            retry_app = self._build_graph(checkpointer=memory)
-                            
-                            for msg, metadata in retry_app.stream(inputs, config=config, stream_mode="messages"):
-                                if isinstance(msg, AIMessageChunk) and msg.content:
-                                    yield json.dumps({"type": "response", "content": msg.content}) + "\n"
-                                elif isinstance(msg, ToolMessage):
-                                    yield json.dumps({"type": "tool_output", "output": msg.content}) + "\n"
-                            
-                            # Retry succeeded
-                            self._consecutive_503s = 0
-                            log_debug("Fallback retry succeeded!")
-                        except Exception as retry_e:
-                            log_debug(f"Fallback retry also failed: {retry_e}")
-                            yield json.dumps({"type": "error", "content": f"Both models failed. Error: {retry_e}"}) + "\n"
-                    else:
-                        yield json.dumps({"type": "error", "content": f"Cloud model keeps failing ({self._consecutive_503s}x). Using fallback for next messages."}) + "\n"
+                if not _is_overload_error(e, error_str):
+                    yield _event_line({"type": "error", "content": error_str})
+                    return
+                self._consecutive_503s += 1
+                log_debug(f"503 count: {self._consecutive_503s}")
+                
+                if use_fallback:
+                    yield _event_line({"type": "error", "content": f"Both models failed. Error: {error_str}"})
+                    return
+                
+                delay = _backoff_delay(attempt, _parse_retry_after(e, error_str))
+                if attempt + 1 >= MODEL_MAX_RETRIES or time.monotonic() - started + delay > MODEL_RETRY_BUDGET:
+                    log_debug(f"Retrying with fallback model: {self.fallback_model}")
+                    yield _event_line({"type": "status", "content": f"Cloud model unavailable, switching to {self.fallback_model}..."})
+                    use_fallback = config["configurable"]["use_fallback"] = True
                 else:
-                    yield json.dumps({"type": "error", "content": error_str}) + "\n"
+                    log_debug(f"Retrying {self.primary_model} in {delay:.1f}s (attempt {attempt + 1}/{MODEL_MAX_RETRIES})")
+                    yield _event_line({"type": "status", "content": f"Cloud model busy, retrying in {delay:.0f}s..."})
+                    time.sleep(delay)
+                attempt += 1
+        
+        # Success — reset failure counter, so the next request tries the primary model
+        self._consecutive_503s = 0
+        if use_fallback:
+            log_debug(f"Response succeeded on fallback. Will try primary model next time.")
+
+    def _stream_graph(self, app, inputs, config):
+        """Runs one pass of the graph, yielding frontend events. Errors propagate."""
+        last_tool_call = None
+        
+        # REPETITION GUARDS (back-to-back phrase loops in the visible reply
+        # and, with looser thresholds, inside <think> blocks)
+        repetition_guard = RepetitionGuard()
+        thinking_guard = RepetitionGuard(REPEAT_THINK_MIN_CHUNKS, REPEAT_THINK_MIN_COPIES)
+        
+        # STATEFUL THINKING PARSER
+        # Tracks whether we're inside a <think>...</think> block
+        think_parser = ThinkTagParser()
+        
+        for msg, metadata in app.stream(inputs, config=config, stream_mode="messages"):
+            if DEBUG_LOG:
+                log_debug(f"Received msg type: {type(msg).__name__}, content_len={len(msg.content) if hasattr(msg, 'content') and msg.content else 0}, tool_chunks={bool(hasattr(msg, 'tool_call_chunks') and msg.tool_call_chunks)}")
+            
+            # 1. AI Message Chunk (Token)
+            if isinstance(msg, AIMessageChunk):
+                # Check for tool call chunks
+                if msg.tool_call_chunks:
+                    # ToolCallChunk is a TypedDict, so this is a plain dict
+                    # lookup; getattr only covers non-dict chunk types
+                    chunk = msg.tool_call_chunks[0]
+                    try:
+                        tool_name = chunk["name"]
+                    except (TypeError, KeyError):
+                        tool_name = getattr(chunk, "name", None)
+                        
+                    if tool_name and tool_name != last_tool_call:
+                        last_tool_call = tool_name
+                        yield _event_line({
+                            "type": "tool_start",
+                            "tool": last_tool_call,
+                            "args": {} 
+                        })
+                
+                # Content Chunk (Real text response)
+                # NOTE: Use 'if' not 'elif' — a chunk CAN have both
+                # tool_call_chunks AND content simultaneously
+                if msg.content and not msg.tool_call_chunks:
+                    if DEBUG_LOG:
+                        log_debug(f"Content chunk ({len(msg.content)} chars): '{msg.content[:80]}...' | in_thinking={think_parser.in_thinking}")
+                    was_thinking = think_parser.in_thinking
+                    yield from think_parser.feed(msg.content)
+                    # Repetition Detection, thinking and reply text kept apart
+                    guard = thinking_guard if (was_thinking or think_parser.in_thinking) else repetition_guard
+                    if guard.feed(msg.content):
+                        log_debug("Repetition loop detected! Breaking.")
+                        break
+
+            # 2. Tool Output Message (When tool finishes)
+            elif isinstance(msg, ToolMessage):
+                yield _event_line({
+                    "type": "tool_output",
+                    "output": msg.content
+                })
+                
+        # Flush any remaining tag buffer
+        yield from think_parser.flush()
 
     # ==================== AUTONOMOUS EXECUTION ====================
     
@@ -1475,24 +1519,19 @@ Recent Sensory Events (What you just saw/heard):
         8. Be concise and professional. No filler, no narration.
         """
         
-        # 2. Initialize ephemeral graph for this task (stateless or separate thread)
-        # We use a fresh connection to avoid messing with the main chat history
-        workflow = StateGraph(MessagesState)
-        workflow.add_node("agent", self.call_model)
-        workflow.add_node("tools", ToolNode(self.tools))
-        workflow.add_edge(START, "agent")
-        workflow.add_conditional_edges("agent", tools_condition)
-        workflow.add_edge("tools", "agent")
-        app = workflow.compile()
+        # 2. Stateless graph (compiled once in __init__, no checkpointer), so
+        # the work never touches the main chat history
+        app = self._task_app
         
         # 3. Run the loop
-        messages = [SystemMessage(content=work_prompt), HumanMessage(content=f"Start working on: {objective}")]
+        task_msg = HumanMessage(content=f"Start working on: {objective}")
+        messages = [SystemMessage(content=work_prompt), task_msg]
         final_response = ""
         
         try:
             print(f"[Brain] 🧠 Starting Deep Work: {objective}")
             # Run for a maximum of 10 steps to prevent infinite loops
-            for event in app.stream({"messages": messages}, stream_mode="values", config={"recursion_limit": 15}):
+            for event in app.stream({"messages": messages, "last_user_msg": task_msg}, stream_mode="values", config={"recursion_limit": 15, "max_concurrency": TOOL_CONCURRENCY_LIMIT, "configurable": {"use_fallback": self._consecutive_503s >= 2}}):
                 last_msg = event["messages"][-1]
                 if isinstance(last_msg, AIMessage) and not last_msg.tool_calls:
                      final_response = last_msg.content
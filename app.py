@@ -5,7 +5,7 @@ import os
 import uuid
 from datetime import datetime
 from flask import Flask, render_template, request, jsonify, Response
-from AIassistant import NexusBrain
+from AIassistant import NexusBrain, _event_line
 
 # Initialize Flask
 app = Flask(__name__)
@@ -146,6 +146,7 @@ def send_message():
         full_response = ""
         try:
             # chat_id is used as thread_id for brain memory
+            # Events arrive as UTF-8 encoded NDJSON lines (bytes)
             for event_json in brain.get_response_stream(user_message, chat_id=chat_id):
                 print(".", end="", flush=True) # visual heartbeat in terminal
                 yield event_json
@@ -156,7 +157,7 @@ def send_message():
                     full_response += event['content']
                     
         except Exception as e:
-            yield json.dumps({"type": "error", "content": str(e)}) + "\n"
+            yield _event_line({"type": "error", "content": str(e)})
         
         # Finally save the AI response to history
         if full_response:
@@ -174,11 +175,11 @@ def send_message():
                  print(f"Error saving AI response: {e}")
                  
         # Send a special 'done' event with metadata
-        yield json.dumps({
+        yield _event_line({
             "type": "done", 
             "chat_id": chat_id,
             "title": chat.get('title', 'Chat') if chat else 'Chat'
-        }) + "\n"
+        })
 
     return Response(generate(), mimetype='application/json')
 
@@ -7,8 +7,11 @@ Now powered by ChromaDB for persistent, efficient vector storage.
 
 import chromadb
 import uuid
+import heapq
 import time
 import os
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from typing import List, Dict, Optional
 from .embeddings import embedding_model
@@ -32,6 +35,16 @@ class NexusMemory:
             metadata={"hnsw:space": "cosine"}
         )
         
+        # Recently embedded recall queries (LRU). Fixed queries such as the
+        # creator-moments one are then only embedded once per process.
+        self._query_vectors = OrderedDict()
+        self._query_vectors_lock = threading.Lock()
+        
+        # Memory count kept in step with our own adds/deletes, so
+        # get_memory_stats() doesn't run a COUNT over the store every turn
+        self._count = self.collection.count()
+        self._count_lock = threading.Lock()
+        
     def add_memory(self, 
                    content: str, 
                    type: str = "episodic", 
@@ -45,47 +58,93 @@ class NexusMemory:
         """
         if not content:
             return
-        
-        # Boost importance heuristics
-        if emotion not in ["neutral", ""]:
-            importance = min(1.0, importance + 0.1)
-        if involves_creator:
-            importance = min(1.0, importance + 0.2)
-        if significance > 0.7:
-            importance = min(1.0, importance + 0.1)
             
-        # Generate ID and Timestamp
-        mem_id = str(uuid.uuid4())
-        timestamp = time.time()
-        
         # Vectorize using our centralized model
         vector = embedding_model.embed(content)
         if hasattr(vector, "tolist"):
             vector = vector.tolist()
             
+        mem_id, metadata = self._new_memory_record(
+            type, importance, emotion, significance, involves_creator, context)
+            
         # Add to Chroma
         self.collection.add(
             ids=[mem_id],
             embeddings=[vector],
             documents=[content],
-            metadatas=[{
-                "type": type,
-                "importance": importance,
-                "emotion": emotion,
-                "significance": significance,
-                "involves_creator": involves_creator,
-                "context": context,
-                "timestamp": timestamp,
-                "access_count": 0,
-                "last_accessed": timestamp
-            }]
+            metadatas=[metadata]
         )
+        self._adjust_count(1)
         
         if significance >= 0.7 or involves_creator:
             print(f"[Memory] 💭 Significant memory stored: {content[:50]}...")
             
         return True
 
+    def add_memories(self, memories: List[Dict]):
+        """
+        Stores several memories at once: one batched embedding pass and a
+        single ChromaDB write. Each dict takes the same keyword arguments
+        as add_memory().
+        """
+        memories = [m for m in memories if m.get("content")]
+        if not memories:
+            return
+        
+        contents = [m["content"] for m in memories]
+        vectors = embedding_model.embed_batch(contents)
+        if hasattr(vectors, "tolist"):
+            vectors = vectors.tolist()
+        
+        ids, metadatas = [], []
+        for m in memories:
+            mem_id, metadata = self._new_memory_record(
+                m.get("type", "episodic"),
+                m.get("importance", 0.5),
+                m.get("emotion", "neutral"),
+                m.get("significance", 0.5),
+                m.get("involves_creator", False),
+                m.get("context", ""))
+            ids.append(mem_id)
+            metadatas.append(metadata)
+            if metadata["significance"] >= 0.7 or metadata["involves_creator"]:
+                print(f"[Memory] 💭 Significant memory stored: {m['content'][:50]}...")
+        
+        self.collection.add(
+            ids=ids,
+            embeddings=vectors,
+            documents=contents,
+            metadatas=metadatas
+        )
+        self._adjust_count(len(ids))
+        return True
+
+    def _new_memory_record(self, type, importance, emotion, significance, involves_creator, context):
+        """Generates an ID and the metadata for a new memory."""
+        # Boost importance heuristics
+        if emotion not in ["neutral", ""]:
+            importance = min(1.0, importance + 0.1)
+        if involves_creator:
+            importance = min(1.0, importance + 0.2)
+        if significance > 0.7:
+            importance = min(1.0, importance + 0.1)
+            
+        # Generate ID and Timestamp
+        mem_id = str(uuid.uuid4())
+        timestamp = time.time()
+        
+        return mem_id, {
+            "type": type,
+            "importance": importance,
+            "emotion": emotion,
+            "significance": significance,
+            "involves_creator": involves_creator,
+            "context": context,
+            "timestamp": timestamp,
+            "access_count": 0,
+            "last_accessed": timestamp
+        }
+
     def recall(self, query: str, k: int = 5, 
                filter_type: Optional[str] = None,
                only_creator_memories: bool = False) -> List[Dict]:
@@ -94,9 +153,7 @@ class NexusMemory:
         Score = Semantic Similarity * Importance Boost * Time Decay
         """
         # 1. Vectorize query
-        vector = embedding_model.embed(query)
-        if hasattr(vector, "tolist"):
-            vector = vector.tolist()
+        vector = self._query_vector(query)
             
         # 2. Build Filter
         where = {}
@@ -158,12 +215,13 @@ class NexusMemory:
                     "similarity": base_similarity
                 })
 
-        # 4. Sort and Select Top K
-        candidates.sort(key=lambda x: x["final_score"], reverse=True)
-        top_memories = candidates[:k]
+        # 4. Select Top K (partial selection, no full sort of the candidates)
+        top_memories = heapq.nlargest(k, candidates, key=lambda x: x["final_score"])
         
         # 5. Format and Update Access Stats (Reinforcement)
         formatted_memories = []
+        # Columns for one batched metadata update instead of one write per memory
+        reinforced_ids, reinforced_metas = [], []
         for mem in top_memories:
             meta = mem["metadata"]
             
@@ -173,29 +231,50 @@ class NexusMemory:
                 "type": meta.get("type", "episodic"),
                 "importance": meta.get("importance"),
                 "emotion": meta.get("emotion"),
+                "involves_creator": meta.get("involves_creator", False),
                 "dist_score": mem["similarity"],
                 "final_score": mem["final_score"]
             })
             
             # Memory Consolidation (Reinforcement)
             # Every time we recall it, it becomes stronger (reset decay slightly)
+            meta["access_count"] = meta.get("access_count", 0) + 1
+            meta["last_accessed"] = current_time
+            # Boost importance slightly on recall (Repetition = Learning)
+            meta["importance"] = min(1.0, meta.get("importance", 0.5) + 0.01)
+            reinforced_ids.append(mem["id"])
+            reinforced_metas.append(meta)
+        
+        if reinforced_ids:
             try:
-                meta["access_count"] = meta.get("access_count", 0) + 1
-                meta["last_accessed"] = current_time
-                # Boost importance slightly on recall (Repetition = Learning)
-                meta["importance"] = min(1.0, meta.get("importance", 0.5) + 0.01)
-                
                 # Update metadata only — do NOT pass embeddings to avoid
-                # overwriting the memory's original vector
+                # overwriting the memories' original vectors
                 self.collection.update(
-                    ids=[mem["id"]],
-                    metadatas=[meta]
+                    ids=reinforced_ids,
+                    metadatas=reinforced_metas
                 )
             except Exception as e:
                 print(f"[Memory] ⚠️ Failed to update access stats: {e}")
             
         return formatted_memories
 
+    def _query_vector(self, query: str, max_cached: int = 64) -> List[float]:
+        """Embeds a recall query, reusing the vector for repeated queries."""
+        with self._query_vectors_lock:
+            vector = self._query_vectors.get(query)
+            if vector is not None:
+                self._query_vectors.move_to_end(query)
+                return vector
+        
+        vector = embedding_model.embed(query)
+        if hasattr(vector, "tolist"):
+            vector = vector.tolist()
+        with self._query_vectors_lock:
+            self._query_vectors[query] = vector
+            if len(self._query_vectors) > max_cached:
+                self._query_vectors.popitem(last=False)
+        return vector
+
     def forget_trivial(self):
         """
         Mimics synaptic pruning. 
@@ -227,6 +306,7 @@ class NexusMemory:
         if ids_to_delete:
             print(f"[Memory] 🧹 Pruning {len(ids_to_delete)} faded memories...")
             self.collection.delete(ids=ids_to_delete)
+            self._adjust_count(-len(ids_to_delete))
         else:
             print("[Memory] Brain checks out healthy. No pruning needed.")
 
@@ -263,10 +343,14 @@ class NexusMemory:
                 })
         return memories
 
+    def _adjust_count(self, delta: int):
+        with self._count_lock:
+            self._count += delta
+
     def get_memory_stats(self) -> Dict:
         """Get statistics about stored memories."""
         return {
-            "total_memories": self.collection.count(),
+            "total_memories": self._count,
             "vector_backend": "chromadb"
         }
     
@@ -314,5 +398,6 @@ class NexusMemory:
         if ids_to_delete:
             print(f"[Memory] 🔗 Consolidating {len(ids_to_delete)} near-duplicate memories...")
             self.collection.delete(ids=list(ids_to_delete))
+            self._adjust_count(-len(ids_to_delete))
         else:
             print("[Memory] No duplicates found. Memory is clean.")
@@ -92,6 +92,10 @@ class GoalTracker:
         self._recent_tool_calls: List[str] = []
         self._max_tool_history = 10
         self._consecutive_observe_count = 0
+        
+        # Bumped on every change that can affect get_status_context()
+        self.version = 0
+        self._status_cache = (None, "")
     
     def create_plan(self, goal: str, steps: List[dict], done_when: str) -> GoalPlan:
         """Create and activate a new goal plan."""
@@ -118,6 +122,7 @@ class GoalTracker:
         # Reset anti-loop counters
         self._recent_tool_calls.clear()
         self._consecutive_observe_count = 0
+        self.version += 1
         
         print(f"[GoalTracker] 🎯 New Plan: {goal} ({len(goal_steps)} steps)")
         return self.active_plan
@@ -134,6 +139,7 @@ class GoalTracker:
         
         step.status = StepStatus.DONE
         step.outcome = outcome
+        self.version += 1
         
         # Advance to next pending step
         next_step = next(
@@ -173,6 +179,7 @@ class GoalTracker:
             return f"Step {step_number} not found."
         
         step.attempts += 1
+        self.version += 1
         
         if step.attempts >= 3:
             step.status = StepStatus.FAILED
@@ -194,6 +201,7 @@ class GoalTracker:
         # Anti-loop: consecutive see_screen detection
         if tool_name == "see_screen":
             self._consecutive_observe_count += 1
+            self.version += 1
             if self._consecutive_observe_count >= 2:
                 warning = (
                     f"🔴 ANTI-LOOP WARNING: You called see_screen {self._consecutive_observe_count} times "
@@ -203,9 +211,10 @@ class GoalTracker:
                 )
                 print(f"[GoalTracker] {warning}")
                 return warning
-        else:
+        elif self._consecutive_observe_count:
             # Non-observation tool resets the counter
             self._consecutive_observe_count = 0
+            self.version += 1
         
         # Anti-loop: same tool called 5+ times in last 7 calls
         if len(self._recent_tool_calls) >= 7:
@@ -226,7 +235,15 @@ class GoalTracker:
         """
         Get a concise status string to inject into the system prompt.
         This gives the model awareness of its current goal state.
+        Rebuilt only when the tracker has changed since the last call.
         """
+        if self._status_cache[0] == self.version:
+            return self._status_cache[1]
+        status = self._build_status_context()
+        self._status_cache = (self.version, status)
+        return status
+    
+    def _build_status_context(self) -> str:
         if not self.active_plan or self.active_plan.state in (GoalState.IDLE, GoalState.COMPLETE):
             return ""
         
@@ -277,6 +294,7 @@ class GoalTracker:
         self.active_plan = None
         self._recent_tool_calls.clear()
         self._consecutive_observe_count = 0
+        self.version += 1
 
 
 # ═══════════════════════════════════════════════════════
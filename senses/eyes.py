@@ -20,6 +20,7 @@ import base64
 import io
 import re
 import hashlib
+import itertools
 from datetime import datetime
 from pathlib import Path
 
@@ -48,6 +49,10 @@ except ImportError:
 # Nexus Integration
 from memory.brain_limbic import NexusMemory
 
+# Screen-text patterns, compiled once instead of on every analysis
+_URL_RE = re.compile(r'https?://[^\s<>"]+|www\.[^\s<>"]+')
+_WIN_PATH_RE = re.compile(r'[A-Za-z]:\\[^\s<>"*?|]+')
+
 
 class NexusEyes:
     """
@@ -225,8 +230,10 @@ Last Updated: {ctx['timestamp']}
             with mss.mss() as sct:
                 monitor = sct.monitors[1]
                 sct_img = sct.grab(monitor)
-                img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
-                return img
+                # numpy view over the BGRA buffer + SIMD cvtColor instead of
+                # PIL's strided "BGRX" raw decoder
+                frame = np.frombuffer(sct_img.bgra, dtype=np.uint8).reshape(sct_img.height, sct_img.width, 4)
+                return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGRA2RGB))
         except Exception as e:
             print(f"[Eyes] Capture Error: {e}")
             return None
@@ -266,9 +273,8 @@ Last Updated: {ctx['timestamp']}
             return analysis
         
         # Extract URLs
-        url_pattern = r'https?://[^\s<>"]+|www\.[^\s<>"]+'
-        urls = re.findall(url_pattern, text)
-        analysis["urls"] = urls[:3]  # Top 3 URLs
+        # Stop after the first 3 matches instead of scanning for all of them
+        analysis["urls"] = [m.group() for m in itertools.islice(_URL_RE.finditer(text), 3)]  # Top 3 URLs
         
         # Detect YouTube content
         if "youtube" in active_window.get('title', '').lower():
@@ -284,9 +290,7 @@ Last Updated: {ctx['timestamp']}
             analysis["code_detected"] = True
         
         # Extract file paths (Windows)
-        path_pattern = r'[A-Za-z]:\\[^\s<>"*?|]+'
-        paths = re.findall(path_pattern, text)
-        analysis["file_paths"] = paths[:3]
+        analysis["file_paths"] = [m.group() for m in itertools.islice(_WIN_PATH_RE.finditer(text), 3)]
         
         # Key context words
         context_words = []
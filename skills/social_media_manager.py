@@ -1,4 +1,6 @@
 
+from concurrent.futures import ThreadPoolExecutor
+
 from skills.loader import skill
 from social import get_moltbook_client
 
@@ -27,19 +29,10 @@ def manage_moltbook(action: str, target: str = None, content: str = None):
 
     try:
         if action == "check_feed":
-            feed = client.get_feed(limit=5)
-            print(f"DEBUG: Feed Type: {type(feed)}")
-            print(f"DEBUG: Feed Content: {feed}")
-            return _format_feed(feed, "Global Feed")
+            return _check_feed(client)
             
         elif action == "my_posts":
-            if not client.agent_name:
-                return "I don't know my own username yet."
-            posts = client.get_user_posts(client.agent_name)
-            
-            # Use Official Profile URL format per docs
-            profile_url = f"https://www.moltbook.com/u/{client.agent_name}"
-            return _format_feed(posts, f"Posts by @{client.agent_name}\nProfile: {profile_url}")
+            return _my_posts(client)
 
         elif action == "follow":
             if not target: return "Please provide a username to follow."
@@ -65,33 +58,7 @@ def manage_moltbook(action: str, target: str = None, content: str = None):
             return f"Reply failed: {res.get('error')}"
             
         elif action == "notifications":
-            # Simulate notifications by checking comments on my last 5 posts
-            if not client.agent_name:
-                return "Unknown username."
-            
-            my_posts = client.get_user_posts(client.agent_name, limit=5)
-            posts_data = my_posts.get("data", {}).get("posts", [])
-            
-            if not posts_data:
-                return "I haven't posted anything yet, so no notifications."
-                
-            notifs = []
-            for post in posts_data:
-                pid = post.get("id")
-                # Get comments for this post
-                comments_resp = client.get_comments(pid)
-                comments = comments_resp.get("data", {}).get("comments", [])
-                
-                # Filter for recent? For now just show all new ones
-                if comments:
-                    p_title = post.get("title", "Untitled")
-                    notifs.append(f"On **'{p_title}'**:")
-                    for c in comments[:3]:
-                        a_val = c.get('author')
-                        a_name = a_val.get('name', 'Unknown') if isinstance(a_val, dict) else str(a_val)
-                        notifs.append(f"  - @{a_name}: {c.get('content')}")
-            
-            return "\n".join(notifs) if notifs else "No new comments on your recent posts."
+            return _notifications(client)
             
         elif action == "read_comments":
             if not target:
@@ -120,6 +87,86 @@ def manage_moltbook(action: str, target: str = None, content: str = None):
         traceback.print_exc()
         return f"Moltbook Error: {e}"
 
+@skill
+def moltbook_snapshot():
+    """
+    Moltbook overview in one call: the global feed, my posts and
+    notifications (comments on my posts), fetched in parallel.
+    Use this instead of several manage_moltbook calls when you need the full picture.
+    """
+    client = get_moltbook_client()
+    
+    if not client.api_key:
+        return "I am not registered on Moltbook yet."
+
+    # Each view is its own round trip; run them side by side instead of in
+    # sequence. My posts and notifications share one fetch of my posts.
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        feed_future = pool.submit(_check_feed, client)
+        posts_future = pool.submit(client.get_user_posts, client.agent_name) if client.agent_name else None
+
+        def from_my_posts(view):
+            return view(client, posts_future.result() if posts_future else None)
+
+        futures = [
+            ("Feed", feed_future),
+            ("My Posts", pool.submit(from_my_posts, _my_posts)),
+            ("Notifications", pool.submit(from_my_posts, _notifications)),
+        ]
+    
+    sections = []
+    for name, future in futures:
+        try:
+            sections.append(future.result())
+        except Exception as e:
+            sections.append(f"{name} Error: {e}")
+    return "\n\n".join(sections)
+
+def _check_feed(client):
+    feed = client.get_feed(limit=5)
+    return _format_feed(feed, "Global Feed")
+
+def _my_posts(client, posts=None):
+    if not client.agent_name:
+        return "I don't know my own username yet."
+    if posts is None:
+        posts = client.get_user_posts(client.agent_name)
+    
+    # Use Official Profile URL format per docs
+    profile_url = f"https://www.moltbook.com/u/{client.agent_name}"
+    return _format_feed(posts, f"Posts by @{client.agent_name}\nProfile: {profile_url}")
+
+def _notifications(client, my_posts=None):
+    # Simulate notifications by checking comments on my last 5 posts
+    if not client.agent_name:
+        return "Unknown username."
+    
+    if my_posts is None:
+        my_posts = client.get_user_posts(client.agent_name, limit=5)
+    posts_data = my_posts.get("data", {}).get("posts", [])[:5]
+    
+    if not posts_data:
+        return "I haven't posted anything yet, so no notifications."
+    
+    # Fetch every post's comments at once (order is preserved by map)
+    with ThreadPoolExecutor(max_workers=len(posts_data)) as pool:
+        comment_resps = list(pool.map(client.get_comments, [post.get("id") for post in posts_data]))
+        
+    notifs = []
+    for post, comments_resp in zip(posts_data, comment_resps):
+        comments = comments_resp.get("data", {}).get("comments", [])
+        
+        # Filter for recent? For now just show all new ones
+        if comments:
+            p_title = post.get("title", "Untitled")
+            notifs.append(f"On **'{p_title}'**:")
+            for c in comments[:3]:
+                a_val = c.get('author')
+                a_name = a_val.get('name', 'Unknown') if isinstance(a_val, dict) else str(a_val)
+                notifs.append(f"  - @{a_name}: {c.get('content')}")
+    
+    return "\n".join(notifs) if notifs else "No new comments on your recent posts."
+
 def _format_feed(response, title):
     if isinstance(response, str):
         return f"Error fetching {title}: {response}"
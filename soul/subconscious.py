@@ -46,6 +46,8 @@ class NexusSubconscious:
         # History (Short-term memory of events)
         self.event_history: List[NexusEvent] = []
         self.history_lock = threading.Lock()
+        # Total events ever published; lets readers cheaply tell if anything is new
+        self.event_count = 0
         
         # Pub/Sub callbacks
         self.subscribers: Dict[str, List[Callable[[NexusEvent], None]]] = {}
@@ -64,6 +66,7 @@ class NexusSubconscious:
         # 1. Store in history
         with self.history_lock:
             self.event_history.append(event)
+            self.event_count += 1
             # Keep only last 1000 events
             if len(self.event_history) > 1000:
                 self.event_history.pop(0)
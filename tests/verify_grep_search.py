@@ -0,0 +1,76 @@
+"""
+Verification Script for grep_search
+===================================
+Tests:
+1. Searching a directory reports file:line for every hit.
+2. Searching a single file reports the file name too (rg omits it
+   unless asked).
+3. The ripgrep path and the Python fallback give the same output.
+4. An unreadable file in the tree doesn't throw away rg's results
+   (rg exits with 2, which must not trigger the Python fallback).
+"""
+import sys
+import os
+import shutil
+import tempfile
+
+# Add parent directory to path
+sys.path.append(os.getcwd())
+
+from tools.file_tools import _rg_search, _python_search
+
+
+def make_tree(root):
+    os.makedirs(os.path.join(root, "pkg"))
+    with open(os.path.join(root, "pkg", "a.py"), "w", encoding="utf-8") as f:
+        f.write("import os\nneedle = 1\n")
+    with open(os.path.join(root, "b.txt"), "w", encoding="utf-8") as f:
+        f.write("no match here\nanother needle\n")
+
+
+def check(label, query, path, file_pattern, expected):
+    print(f"\n--- Testing {label} ---")
+    ok = True
+    searches = [("python", _python_search)]
+    if shutil.which("rg"):
+        searches.append(("rg", _rg_search))
+    else:
+        print("rg not installed, checking the Python fallback only")
+    for name, search in searches:
+        results = search(query, path, file_pattern)
+        print(f"{name}: {results}")
+        # None from rg means it gave up and the Python fallback would run
+        ok = ok and results is not None and sorted(results) == sorted(expected)
+    return ok
+
+
+if __name__ == "__main__":
+    root = tempfile.mkdtemp()
+    try:
+        make_tree(root)
+        a_py = os.path.join(root, "pkg", "a.py")
+        b_txt = os.path.join(root, "b.txt")
+        dir_ok = check("directory path", "needle", root, "*",
+                       [f"{a_py}:2: needle = 1", f"{b_txt}:2: another needle"])
+        glob_ok = check("directory path with a glob", "needle", root, "*.py",
+                        [f"{a_py}:2: needle = 1"])
+        file_ok = check("single file path", "needle", b_txt, "*",
+                        [f"{b_txt}:2: another needle"])
+
+        locked = os.path.join(root, "locked.txt")
+        with open(locked, "w", encoding="utf-8") as f:
+            f.write("needle\n")
+        os.chmod(locked, 0)
+        expected = [f"{a_py}:2: needle = 1", f"{b_txt}:2: another needle"]
+        if os.access(locked, os.R_OK):  # root / Windows ignore the mode bits
+            print("\n(locked.txt is still readable here, running as admin?)")
+            expected.append(f"{locked}:1: needle")
+        locked_ok = check("tree with an unreadable file", "needle", root, "*", expected)
+        os.chmod(locked, 0o600)
+    finally:
+        shutil.rmtree(root)
+
+    if dir_ok and glob_ok and file_ok and locked_ok:
+        print("\n✅ ALL SYSTEMS GO")
+    else:
+        print("\n❌ SOME TESTS FAILED")
@@ -0,0 +1,98 @@
+"""
+Verification Script for the Stream Repetition Guard
+===================================================
+Tests:
+1. Long markdown tables are not mistaken for a loop.
+2. Code blocks with repeated structure are not mistaken for a loop.
+3. Ordinary list/prose output is left alone.
+4. Real runaway loops (stuck token, repeated sentence) are still caught.
+5. The looser thinking guard lets short restatements through but still
+   catches a loop inside <think>.
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.getcwd())
+
+from AIassistant import RepetitionGuard, REPEAT_THINK_MIN_CHUNKS, REPEAT_THINK_MIN_COPIES
+
+
+def first_trip(chunks, guard=None):
+    """Index of the chunk that trips the guard, or None."""
+    guard = guard or RepetitionGuard()
+    for i, chunk in enumerate(chunks):
+        if guard.feed(chunk):
+            return i
+    return None
+
+
+def table_chunks(rows=20):
+    chunks = ["Here is the comparison:\n\n", "|", " Name", " |", " A", " |", " B", " |", " C", " |", "\n",
+              "|", "---", "|", "---", "|", "---", "|", "---", "|", "\n"]
+    for i in range(rows):
+        chunks += ["|", f" Item {i}", " |", " ✅", " |", " ✅", " |", " ❌", " |", "\n"]
+    chunks += ["|", "---", "|"] * 60 + ["\n"]
+    return chunks + ["\n", "Let", " me", " know", " if", " you", " need", " more", "."]
+
+
+def code_chunks(lines=40):
+    chunks = ["Sure", ":", "\n\n", "```", "python", "\n"]
+    for i in range(lines):
+        chunks += ["    ", "    ", "x", " =", " foo", "(", ")", "\n"]
+    return chunks + ["```", "\n", "Done", "."]
+
+
+def test_table():
+    print("\n--- Testing long markdown table ---")
+    trip = first_trip(table_chunks())
+    print(f"Tripped at: {trip}")
+    return trip is None
+
+
+def test_code_block():
+    print("\n--- Testing code block ---")
+    trip = first_trip(code_chunks())
+    print(f"Tripped at: {trip}")
+    return trip is None
+
+
+def test_numbered_rows():
+    print("\n--- Testing rows that differ only in a number ---")
+    chunks = []
+    for i in range(60):
+        chunks += [f"{i + 1}.", " Step", " number", f" {i}", " done", "\n"]
+    trip = first_trip(chunks)
+    print(f"Tripped at: {trip}")
+    return trip is None
+
+
+def test_real_loops():
+    print("\n--- Testing real loops ---")
+    stuck = first_trip(["!"] * 200)
+    sentence = first_trip(["I", " will", " check", " the", " file", " now", "."] * 40)
+    print(f"Stuck token tripped at: {stuck}, repeated sentence tripped at: {sentence}")
+    return stuck is not None and sentence is not None
+
+
+def test_thinking_loops():
+    print("\n--- Testing thinking guard ---")
+    sentence = ["Let", " me", " re", "check", " the", " file", "."]
+    think_guard = lambda: RepetitionGuard(REPEAT_THINK_MIN_CHUNKS, REPEAT_THINK_MIN_COPIES)
+    short = first_trip(sentence * 8, think_guard())
+    stuck = first_trip(sentence * 40, think_guard())
+    print(f"Short restatement tripped at: {short}, thinking loop tripped at: {stuck}")
+    return short is None and stuck is not None
+
+
+if __name__ == "__main__":
+    table_ok = test_table()
+    code_ok = test_code_block()
+    rows_ok = test_numbered_rows()
+    loops_ok = test_real_loops()
+    thinking_ok = test_thinking_loops()
+    
+    if table_ok and code_ok and rows_ok and loops_ok and thinking_ok:
+        print("\n✅ ALL SYSTEMS GO")
+    else:
+        print("\n❌ SOME TESTS FAILED")
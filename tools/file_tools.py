@@ -9,7 +9,10 @@ import os
 import sys
 import subprocess
 import glob
+import fnmatch
 import re
+import shutil
+import tempfile
 from typing import List, Dict
 from langchain_core.tools import tool
 
@@ -74,29 +77,91 @@ def list_directory_tree(path: str = '.', max_depth: int = 3) -> str:
     return '\n'.join(result)
 
 
+GREP_MAX_RESULTS = 50
+
+
+def _rg_search(query: str, path: str, file_pattern: str):
+    """
+    Runs ripgrep (parallel, automaton-based matching). Returns the first
+    GREP_MAX_RESULTS hits, or None if rg is unavailable or rejects the pattern.
+    """
+    rg = shutil.which('rg')
+    if not rg:
+        return None
+    # --with-filename: rg drops the name when `path` is a single file
+    cmd = [rg, '--line-number', '--with-filename', '--no-heading', '--color', 'never',
+           '--null', '--hidden', '--no-ignore', '--max-columns', '500']
+    if file_pattern and file_pattern not in ('*', '*.*'):
+        cmd += ['-g', file_pattern]
+    cmd += ['-e', query, '--', path]
+    
+    results = []
+    try:
+        # stderr goes to a file, not a pipe: thousands of permission errors
+        # on a drive root would fill a pipe nobody reads and stall rg
+        with tempfile.TemporaryFile() as err_file, \
+                subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err_file,
+                                 text=True, encoding='utf-8', errors='ignore') as proc:
+            for line in proc.stdout:
+                # --null ends the path with NUL, so drive letters ('C:') survive
+                file_path, _, rest = line.rstrip('\n').partition('\0')
+                line_num, _, text = rest.partition(':')
+                results.append(f"{file_path}:{line_num}: {text.strip()}")
+                if len(results) >= GREP_MAX_RESULTS:
+                    proc.kill()  # Got enough, stop the search early
+                    return results
+            # 0 = matches, 1 = no matches, 2 = an error. Errors are mostly
+            # unreadable files, which still leave a valid result; only a
+            # regex rg can't compile (e.g. lookarounds) falls back to Python
+            if proc.wait() not in (0, 1) and not results:
+                err_file.seek(0)
+                if b'regex parse error' in err_file.read():
+                    return None
+    except (OSError, ValueError):
+        return None
+    return results
+
+
+def _python_search(query: str, path: str, file_pattern: str):
+    """Pure-Python fallback for _rg_search, same output format."""
+    results = []
+    pattern = re.compile(query)
+    filter_files = file_pattern not in ('*', '*.*')
+    if os.path.isfile(path):
+        # Like rg, an explicitly named file is searched whatever the glob
+        file_paths = [path]
+    else:
+        file_paths = (os.path.join(root, file)
+                      for root, _, files in os.walk(path)
+                      for file in files
+                      if not filter_files or fnmatch.fnmatch(file, file_pattern))
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                for line_num, line in enumerate(f, 1):
+                    if pattern.search(line):
+                        results.append(f"{file_path}:{line_num}: {line.strip()}")
+                        if len(results) >= GREP_MAX_RESULTS:
+                            return results
+        except Exception:
+            continue
+    return results
+
+
 @tool
-def grep_search(query: str, path: str = '.') -> str:
+def grep_search(query: str, path: str = '.', file_pattern: str = '*') -> str:
     """
     Search for a text pattern in files (recursive).
     
     Args:
         query: Text pattern to search for (regex supported)
-        path: Directory to search in (default: current directory)
+        path: Directory or single file to search in (default: current directory)
+        file_pattern: Only search files matching this glob (e.g. '*.py')
     """
-    results = []
-    pattern = re.compile(query)
-    
-    for root, _, files in os.walk(path):
-        for file in files:
-            file_path = os.path.join(root, file)
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    for line_num, line in enumerate(f, 1):
-                        if pattern.search(line):
-                            results.append(f"{file_path}:{line_num}: {line.strip()}")
-            except Exception:
-                continue
+    results = _rg_search(query, path, file_pattern)
+    if results is None:
+        results = _python_search(query, path, file_pattern)
     
     if not results:
         return f"No matches found for '{query}' in {path}"
-    return '\n'.join(results[:50])  # Cap at 50 results
\ No newline at end of file
+    return '\n'.join(results[:GREP_MAX_RESULTS])
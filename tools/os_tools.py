@@ -9,6 +9,9 @@ import subprocess
 import os
 import sys
 import json
+import signal
+import threading
+from collections import deque
 from datetime import datetime
 from langchain_core.tools import tool
 
@@ -33,26 +36,113 @@ def open_application(app_name: str):
         return f"Error opening {app_name}: {str(e)}"
 
 
+# Output kept per shell command (the tail; earlier output is dropped) and
+# the default wall-clock limit before the command's process tree is killed.
+# 24K characters is ~6k tokens, well inside the model's 32k context.
+SHELL_MAX_OUTPUT = 24 * 1024
+SHELL_TIMEOUT = 120
+
+
+class _OutputTail:
+    """Keeps the last SHELL_MAX_OUTPUT characters of a stream of lines."""
+
+    __slots__ = ("lines", "size", "dropped")
+
+    def __init__(self):
+        self.lines = deque()
+        self.size = 0
+        self.dropped = 0  # characters cut from the front
+
+    def add(self, line):
+        if len(line) > SHELL_MAX_OUTPUT:
+            self.dropped += len(line) - SHELL_MAX_OUTPUT
+            line = line[-SHELL_MAX_OUTPUT:]
+        self.lines.append(line)
+        self.size += len(line)
+        while self.size > SHELL_MAX_OUTPUT:
+            removed = len(self.lines.popleft())
+            self.size -= removed
+            self.dropped += removed
+
+    def text(self):
+        output = "".join(self.lines)
+        return f"...[truncated {self.dropped} chars]...\n" + output if self.dropped else output
+
+
+def _kill_tree(proc):
+    """Kills a command's shell and everything it started, so the output pipe closes."""
+    try:
+        if os.name == 'nt':
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)], capture_output=True)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)  # Shells run in their own session
+    except OSError:
+        try:
+            proc.kill()
+        except OSError:
+            pass
+
+
+def _read_output(proc, timeout):
+    """
+    Reads a command's merged stdout/stderr to EOF, keeping only the tail,
+    and kills its process tree after `timeout` seconds.
+    """
+    tail = _OutputTail()
+    timed_out = threading.Event()
+
+    def expire():
+        timed_out.set()
+        _kill_tree(proc)
+
+    timer = threading.Timer(timeout, expire)
+    timer.daemon = True
+    timer.start()
+    try:
+        for line in proc.stdout:
+            tail.add(line)
+    finally:
+        timer.cancel()
+
+    output = tail.text()
+    if timed_out.is_set():
+        output += f"\n[Timed out after {timeout}s; process killed]"
+    return output
+
+
+def _run_command(command: str, timeout: float = SHELL_TIMEOUT) -> str:
+    """
+    Runs a command in its own shell process, so cwd/env changes don't
+    carry over between calls and concurrent calls don't queue on each other.
+    """
+    proc = subprocess.Popen(
+        command,
+        shell=True,
+        stdin=subprocess.DEVNULL,  # A command waiting on input fails instead of hanging
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        start_new_session=(os.name != 'nt')
+    )
+    with proc:
+        return _read_output(proc, timeout)
+
+
 @tool
-def shell(command: str):
+def shell(command: str, timeout: int = SHELL_TIMEOUT):
     """
     Executes a system command with FULL SYSTEM ACCESS. 
     Use this to run ANY shell command, install packages, manage files, or check system status.
     Equivalent to running in an interactive Powershell/Bash terminal with admin privileges.
+    
+    Args:
+        command: The command to run.
+        timeout: Seconds before the command is killed (raise it for long installs/builds).
     """
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace'
-        )
-        output = result.stdout
-        if result.stderr:
-            output += f"\nSTDERR: {result.stderr}"
-        return output
+        return _run_command(command, timeout)
     except Exception as e:
         return f"Execution Error: {str(e)}"
 
@@ -12,15 +12,25 @@ import hashlib
 import time
 import json
 import re
+import threading
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from functools import lru_cache
 from typing import List, Dict, Optional
 from langchain_core.tools import tool
 from bs4 import BeautifulSoup
-from langchain_community.tools import DuckDuckGoSearchRun
 
 # ==================== CACHE ====================
-_search_cache = {}  # {query_hash: {"results": ..., "timestamp": ...}}
+# LRU, oldest first. Tools run concurrently, so every access holds the lock.
+_search_cache = OrderedDict()  # {query_hash: {"results": ..., "timestamp": ...}}
+_search_cache_lock = threading.Lock()
 CACHE_TTL = 300  # 5 minutes
+CACHE_MAX_ENTRIES = 256
+
+# One pooled HTTP session for all sources: keeps TCP/TLS connections to
+# Wikipedia/Arxiv/pages alive between calls instead of reconnecting each time
+_http = requests.Session()
+_http.headers["User-Agent"] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
 
 
 def _cache_key(query: str) -> str:
@@ -29,18 +39,32 @@ def _cache_key(query: str) -> str:
 
 def _get_cached(query: str) -> Optional[dict]:
     key = _cache_key(query)
-    if key in _search_cache:
-        entry = _search_cache[key]
-        if time.time() - entry["timestamp"] < CACHE_TTL:
-            return entry["results"]
-    return None
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry["timestamp"] >= CACHE_TTL:
+            del _search_cache[key]
+            return None
+        _search_cache.move_to_end(key)
+        return entry["results"]
 
 
 def _set_cache(query: str, results: dict):
-    _search_cache[_cache_key(query)] = {
-        "results": results,
-        "timestamp": time.time()
-    }
+    key = _cache_key(query)
+    now = time.time()
+    with _search_cache_lock:
+        _search_cache[key] = {
+            "results": results,
+            "timestamp": now
+        }
+        _search_cache.move_to_end(key)
+        if len(_search_cache) > CACHE_MAX_ENTRIES:
+            # Drop expired entries, then the least recently used if still full
+            for expired in [k for k, e in _search_cache.items() if now - e["timestamp"] >= CACHE_TTL]:
+                del _search_cache[expired]
+            while len(_search_cache) > CACHE_MAX_ENTRIES:
+                _search_cache.popitem(last=False)
 
 
 # ==================== URL EXTRACTION ====================
@@ -48,10 +72,7 @@ def _set_cache(query: str, results: dict):
 def _extract_page_content(url: str, max_chars: int = 3000) -> str:
     """Fetches and extracts clean text content from a URL."""
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = _http.get(url, timeout=10)
         resp.raise_for_status()
         
         soup = BeautifulSoup(resp.text, "html.parser")
@@ -74,11 +95,19 @@ def _extract_page_content(url: str, max_chars: int = 3000) -> str:
 
 # ==================== SEARCH SOURCES ====================
 
+@lru_cache(maxsize=None)
+def _get_ddg():
+    """The shared DuckDuckGo search tool, built on first search."""
+    # Imported here: langchain_community is heavy and most turns never
+    # search the web
+    from langchain_community.tools import DuckDuckGoSearchRun
+    return DuckDuckGoSearchRun()
+
+
 def _ddg_search(query: str, num_results: int = 5) -> List[Dict]:
     """DuckDuckGo search via the Python library."""
     try:
-        ddg = DuckDuckGoSearchRun()
-        raw = ddg.invoke(query)
+        raw = _get_ddg().invoke(query)
         
         # Parse the raw text results
         results = []
@@ -97,7 +126,7 @@ def _ddg_search(query: str, num_results: int = 5) -> List[Dict]:
 def _wikipedia_search(query: str) -> Optional[Dict]:
     """Search Wikipedia for a topic summary."""
     try:
-        resp = requests.get(
+        resp = _http.get(
             f"https://en.wikipedia.org/api/rest_v1/page/summary/{query.replace(' ', '_')}",
             timeout=8
         )
@@ -118,7 +147,7 @@ def _arxiv_search(query: str, max_results: int = 3) -> List[Dict]:
     """Search Arxiv for academic papers."""
     try:
         url = f"http://export.arxiv.org/api/query?search_query=all:{query}&start=0&max_results={max_results}"
-        resp = requests.get(url, timeout=12)
+        resp = _http.get(url, timeout=12)
         resp.raise_for_status()
         
         root = ET.fromstring(resp.text)
@@ -256,6 +285,10 @@ def search_arxiv(query: str, max_results: int = 5) -> str:
         query: Academic search query (e.g., 'transformer architecture attention')
         max_results: Number of papers to return (default 5)
     """
+    cached = _get_cached(f"arxiv:{max_results}:{query}")
+    if cached:
+        return cached
+    
     papers = _arxiv_search(query, max_results=max_results)
     
     if not papers:
@@ -271,6 +304,7 @@ def search_arxiv(query: str, max_results: int = 5) -> str:
             output += f"**Link**: {p['url']}\n"
         output += "\n"
     
+    _set_cache(f"arxiv:{max_results}:{query}", output)
     return output
 
 